@@ -65,6 +65,51 @@ def create_app(*args, **kwargs):
 
     app.config['REMEMBER_COOKIE_DURATION'] = timedelta(days=7)
 
+    # "database" searches with the full-text index, "memory" with an in-process inverted index
+    search_backend=os.environ.get("SEARCH_BACKEND","database")
+    app.config["SEARCH_BACKEND"] = search_backend
+    # Seconds between picking up products changed by other workers in the in-process index
+    search_index_refresh=os.environ.get("SEARCH_INDEX_REFRESH","5")
+    app.config["SEARCH_INDEX_REFRESH"] = int(search_index_refresh)
+
+    # Seconds to serve /api/home/latest from memory, 0 disables the cache
+    homepage_cache_ttl=os.environ.get("HOMEPAGE_CACHE_TTL","60")
+    app.config["HOMEPAGE_CACHE_TTL"] = int(homepage_cache_ttl)
+
+    # Count best sellers over this many recent days, 0 for all time
+    best_sellers_window=os.environ.get("BEST_SELLERS_WINDOW_DAYS","0")
+    app.config["BEST_SELLERS_WINDOW_DAYS"] = int(best_sellers_window)
+
+    # "auto" encodes JSON with orjson when installed, "stdlib" always uses the json module
+    json_provider=os.environ.get("JSON_PROVIDER","auto")
+    app.config["JSON_PROVIDER"] = json_provider
+
+    from services.json_provider import init_json_provider
+    init_json_provider(app)
+
+    # Responses smaller than this many bytes are sent uncompressed
+    compression_min_size=os.environ.get("COMPRESSION_MIN_SIZE","1024")
+    app.config["COMPRESSION_MIN_SIZE"] = int(compression_min_size)
+
+    # gzip level / brotli quality for compressed responses
+    compression_level=os.environ.get("COMPRESSION_LEVEL","6")
+    app.config["COMPRESSION_LEVEL"] = int(compression_level)
+
+    from services.compression import init_compression
+    init_compression(app)
+
+    # Products kept in each worker's read-through cache, and for how many seconds (0 disables it)
+    product_cache_size=os.environ.get("PRODUCT_CACHE_SIZE","10000")
+    app.config["PRODUCT_CACHE_SIZE"] = int(product_cache_size)
+    product_cache_ttl=os.environ.get("PRODUCT_CACHE_TTL","30")
+    app.config["PRODUCT_CACHE_TTL"] = int(product_cache_ttl)
+
+    # Filter and page product listings from an in-memory columnar snapshot, refreshed every N seconds
+    catalog_snapshot=os.environ.get("CATALOG_SNAPSHOT","False")
+    app.config["CATALOG_SNAPSHOT"] = catalog_snapshot.lower() in ("1", "true", "yes")
+    catalog_snapshot_refresh=os.environ.get("CATALOG_SNAPSHOT_REFRESH","5")
+    app.config["CATALOG_SNAPSHOT_REFRESH"] = int(catalog_snapshot_refresh)
+
     # Initialize Extensions
     db.init_app(app)
     Migrate(app, db)
@@ -133,6 +178,20 @@ def create_app(*args, **kwargs):
     app.register_blueprint(cart_bp, url_prefix="/api/cart")
     app.register_blueprint(groupbuy_bp, url_prefix="/api/groupbuy")
 
+    @app.cli.command("rebuild-best-sellers")
+    def rebuild_best_sellers():
+        """Recompute the product sales counters from all completed orders."""
+        from services.best_sellers import rebuild_sales_counters
+        rebuild_sales_counters()
+        db.session.commit()
+
+    @app.cli.command("rebuild-product-neighbors")
+    def rebuild_product_neighbors():
+        """Recompute the "customers also bought" table from all completed orders."""
+        from services.recommendations import rebuild_product_neighbors
+        rebuild_product_neighbors()
+        db.session.commit()
+
     # Error Handling
     @app.errorhandler(404)
     def not_found(error):
@@ -0,0 +1,70 @@
+"""
+POST /api/cart: upsert fast path vs the general ORM path.
+
+Adds products to a cart through each path and reports statements per
+request and requests/sec, first against the local SQLite file and then
+with a simulated network round trip added to every statement, as a
+database on another host would. Run with
+``python bench/add_to_cart.py [latency_ms]``.
+"""
+import contextlib
+import io
+import sys
+import time
+
+from common import bench_app, best_of
+
+LATENCY = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.001
+PRODUCTS = 200
+REQUESTS = 400
+
+
+def main():
+    app = bench_app(PRODUCTS)
+
+    from sqlalchemy import event
+
+    import routes.cart
+    from models import db
+    from models.product import Product
+    from models.user import User
+
+    with app.app_context():
+        db.session.add(User(username="buyer", email="buyer@example.com", password_hash="x"))
+        db.session.execute(db.update(Product).values(stock=10 ** 6))
+        db.session.commit()
+        engine = db.engine
+
+    client = app.test_client()
+    fast_path = routes.cart.add_to_cart_fast
+    statements = []
+
+    def run():
+        statements.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for number in range(REQUESTS):
+                client.post("/api/cart", json={
+                    "email": "buyer@example.com", "product_id": 1 + number % PRODUCTS, "quantity": 1,
+                })
+
+    def record(*args):
+        statements.append(args[2])
+
+    def round_trip(*args):
+        time.sleep(LATENCY)
+
+    event.listen(engine, "before_cursor_execute", record)
+    print(f"{'path':10} {'statements/request':>19} {'local req/s':>12} {f'+{LATENCY * 1000:g} ms/stmt req/s':>22}")
+    for label, view in (("general", routes.cart.add_to_cart_general), ("upsert", fast_path)):
+        routes.cart.add_to_cart_fast = view
+        local = best_of(run, repeat=3)
+        per_request = len(statements) / REQUESTS
+        event.listen(engine, "before_cursor_execute", round_trip)
+        remote = best_of(run, repeat=3)
+        event.remove(engine, "before_cursor_execute", round_trip)
+        print(f"{label:10} {per_request:19.1f} {REQUESTS / local:12,.0f} {REQUESTS / remote:22,.0f}")
+    routes.cart.add_to_cart_fast = fast_path
+
+
+if __name__ == "__main__":
+    main()
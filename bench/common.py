@@ -0,0 +1,57 @@
+"""Shared setup for the benchmark scripts: an app on a throwaway SQLite catalog."""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATABASE_PATH = os.path.join(tempfile.gettempdir(), "ecommerce_bench.db")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + DATABASE_PATH)
+
+
+def bench_app(products, **config):
+    """Return an app whose database holds ``products`` products in 10 categories."""
+    if os.path.exists(DATABASE_PATH):
+        os.remove(DATABASE_PATH)
+    from app import create_app
+    from models import db
+    from models.category import Category
+    from models.product import Product
+    from models.user import User
+
+    app = create_app()
+    app.config.update(config)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username="seller", email="seller@example.com", password_hash="x", role="seller"))
+        db.session.add_all(Category(name=f"Category {number}") for number in range(10))
+        db.session.commit()
+        base = datetime(2025, 1, 1)
+        db.session.execute(db.insert(Product), [
+            {
+                "name": f"Product {number}",
+                "description": f"Description of product {number}, a fairly ordinary item",
+                "price": 5.0 + number % 500,
+                "stock": number % 50,
+                "image_url": f"https://cdn.example.com/products/{number}.jpg",
+                "seller_id": 1,
+                "category_id": 1 + number % 10,
+                "created_at": base + timedelta(seconds=number),
+            }
+            for number in range(products)
+        ])
+        db.session.commit()
+    return app
+
+
+def best_of(func, repeat=5):
+    """Run ``func`` ``repeat`` times and return the fastest wall time in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
@@ -0,0 +1,53 @@
+"""
+Response compression: bytes on the wire and time spent compressing.
+
+Compresses a full /api/home/search payload and one /api/home page at each
+encoding available, then times GET /api/home/latest served from the
+response cache with and without its stored compressed variant. Run with
+``python bench/compression.py [products]``.
+"""
+import sys
+
+from common import bench_app, best_of
+
+PRODUCTS = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+REQUESTS = 500
+
+
+def main():
+    app = bench_app(PRODUCTS, COMPRESSION_MIN_SIZE=0)
+
+    from services.compression import brotli, compress
+    from services.response_cache import response_cache
+
+    client = app.test_client()
+    payloads = (
+        ("search, all products", client.get("/api/home/search").get_data()),
+        ("/api/home page of 50", client.get("/api/home", headers={"Accept-Encoding": "identity"}).get_data()),
+    )
+    encodings = ("gzip", "br") if brotli is not None else ("gzip",)
+
+    print(f"{'payload':22} {'encoding':8} {'bytes':>12} {'ratio':>7} {'compress':>11}")
+    for label, body in payloads:
+        print(f"{label:22} {'identity':8} {len(body):12,}")
+        for encoding in encodings:
+            compressed = compress(body, encoding, app.config["COMPRESSION_LEVEL"])
+            seconds = best_of(lambda: compress(body, encoding, app.config["COMPRESSION_LEVEL"]))
+            print(f"{'':22} {encoding:8} {len(compressed):12,} {len(body) / len(compressed):6.1f}x {seconds * 1000:8.2f} ms")
+
+    def homepage_hits(reuse_variants):
+        response_cache.clear()
+        for _ in range(REQUESTS):
+            if not reuse_variants:
+                for entry in response_cache._entries.values():
+                    entry.encoded.clear()
+            client.get("/api/home/latest", headers={"Accept-Encoding": "gzip"})
+
+    print()
+    for label, reuse in (("recompress every hit", False), ("stored gzip variant", True)):
+        seconds = best_of(lambda: homepage_hits(reuse), repeat=3)
+        print(f"GET /api/home/latest, {label:21} {REQUESTS / seconds:8,.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+JSON encoding of product payloads: Flask's default provider vs FastJSONProvider.
+
+Encodes the full catalog listing and times paged GET /api/home requests
+with each provider. "flask default" is the stdlib provider with the
+per-row isoformat() calls the routes used to make. Run with
+``python bench/json_provider.py [products]``.
+"""
+import sys
+
+from common import bench_app, best_of
+
+PRODUCTS = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+REQUESTS = 200
+
+
+def main():
+    app = bench_app(PRODUCTS)
+
+    from flask.json.provider import DefaultJSONProvider
+
+    from models import db
+    from services.catalog import LISTING_FIELDS, product_select, serialize_products
+    from services.json_provider import FastJSONProvider
+
+    providers = (
+        ("flask default", DefaultJSONProvider(app)),
+        ("fast, stdlib", FastJSONProvider(app, use_orjson=False)),
+        ("fast, orjson", FastJSONProvider(app, use_orjson=True)),
+    )
+    with app.app_context():
+        products = serialize_products(db.session.execute(product_select(LISTING_FIELDS)).all(), LISTING_FIELDS)
+    preformatted = [dict(product, created_at=product["created_at"].isoformat()) for product in products]
+
+    client = app.test_client()
+    print(f"{'provider':14} {'encode ' + format(PRODUCTS, ',') + ' products':>24} {'GET /api/home':>16}")
+    for label, provider in providers:
+        payload = preformatted if label == "flask default" else products
+        encode = best_of(lambda: provider.dumps(payload))
+        app.json = provider
+        requests = best_of(lambda: [client.get("/api/home?limit=100") for _ in range(REQUESTS)], repeat=3)
+        print(f"{label:14} {encode * 1000:21.1f} ms {REQUESTS / requests:11,.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Product listing serialization: ORM instances vs select() row tuples.
+
+"before" loads Product instances with their category and builds each dict
+by hand, as the routes did; "after" is product_select() plus the compiled
+row serializer. Run with ``python bench/serializer.py [products]``.
+"""
+import sys
+
+from common import bench_app, best_of
+
+PRODUCTS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+
+def orm_listing():
+    from sqlalchemy.orm import joinedload
+
+    from models import db
+    from models.product import Product
+
+    products = Product.query.options(joinedload(Product.category)).all()
+    result = [{
+        "id": product.id,
+        "name": product.name,
+        "description": product.description,
+        "price": product.price,
+        "stock": product.stock,
+        "image_url": product.image_url,
+        "seller_id": product.seller_id,
+        "category_id": product.category_id,
+        "category_name": product.category.name if product.category else None,
+        "created_at": product.created_at.isoformat() if product.created_at else None,
+        "uniqueLink": product.uniqueLink,
+    } for product in products]
+    db.session.remove()
+    return result
+
+
+def row_listing():
+    from models import db
+    from services.catalog import LISTING_FIELDS, product_select, serialize_products
+
+    rows = db.session.execute(product_select(LISTING_FIELDS)).all()
+    result = serialize_products(rows, LISTING_FIELDS)
+    db.session.remove()
+    return result
+
+
+def main():
+    app = bench_app(PRODUCTS)
+    with app.app_context():
+        for label, func in (("before (ORM instances)", orm_listing), ("after (row tuples)", row_listing)):
+            seconds = best_of(func, repeat=3)
+            print(f"{label:24} {seconds:7.3f}s  {PRODUCTS / seconds:10,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Add full-text search index on product name and description
+
+Revision ID: 3f1c9a7d2b84
+Revises: 244965deec65
+Create Date: 2026-10-18 09:12:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7d2b84'
+down_revision = '244965deec65'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        # Must match services.search._search_document()
+        op.execute(
+            "CREATE INDEX ix_product_search ON product USING gin ("
+            "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, '')))"
+        )
+
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE product_fts USING fts5("
+            "name, description, content='product', content_rowid='id')"
+        )
+        op.execute(
+            "CREATE TRIGGER product_fts_ai AFTER INSERT ON product BEGIN "
+            "INSERT INTO product_fts(rowid, name, description) "
+            "VALUES (new.id, new.name, new.description); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER product_fts_ad AFTER DELETE ON product BEGIN "
+            "INSERT INTO product_fts(product_fts, rowid, name, description) "
+            "VALUES ('delete', old.id, old.name, old.description); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER product_fts_au AFTER UPDATE OF name, description ON product BEGIN "
+            "INSERT INTO product_fts(product_fts, rowid, name, description) "
+            "VALUES ('delete', old.id, old.name, old.description); "
+            "INSERT INTO product_fts(rowid, name, description) "
+            "VALUES (new.id, new.name, new.description); "
+            "END"
+        )
+        op.execute("INSERT INTO product_fts(product_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_product_search")
+
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS product_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS product_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS product_fts_ai")
+        op.execute("DROP TABLE IF EXISTS product_fts")
@@ -0,0 +1,55 @@
+"""Add product_neighbors co-occurrence table
+
+Revision ID: 5a7d2f9c8e16
+Revises: e91b5c3d7a48
+Create Date: 2026-10-18 16:20:45.113207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a7d2f9c8e16'
+down_revision = 'e91b5c3d7a48'
+branch_labels = None
+depends_on = None
+
+# Must match services.recommendations.NEIGHBORS_KEPT
+NEIGHBORS_KEPT = 50
+
+
+def upgrade():
+    op.create_table('product_neighbors',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('neighbor_id', sa.Integer(), nullable=False),
+    sa.Column('co_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['neighbor_id'], ['product.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id', 'neighbor_id')
+    )
+    with op.batch_alter_table('product_neighbors', schema=None) as batch_op:
+        batch_op.create_index('ix_product_neighbors_product_id_co_count', ['product_id', 'co_count'], unique=False)
+
+    # Backfill the top neighbours from the orders completed so far
+    op.execute(
+        'INSERT INTO product_neighbors (product_id, neighbor_id, co_count) '
+        'SELECT product_id, neighbor_id, co_count FROM ('
+        'SELECT a.product_id AS product_id, b.product_id AS neighbor_id, '
+        'count(DISTINCT a.order_id) AS co_count, '
+        'row_number() OVER (PARTITION BY a.product_id '
+        'ORDER BY count(DISTINCT a.order_id) DESC, b.product_id) AS rank '
+        'FROM order_item a '
+        'JOIN order_item b ON b.order_id = a.order_id AND b.product_id != a.product_id '
+        'JOIN "order" ON "order".id = a.order_id '
+        "WHERE \"order\".status = 'completed' "
+        'GROUP BY a.product_id, b.product_id'
+        f') AS pairs WHERE rank <= {NEIGHBORS_KEPT}'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('product_neighbors', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_neighbors_product_id_co_count')
+
+    op.drop_table('product_neighbors')
@@ -0,0 +1,68 @@
+"""Add product_sales and product_sales_daily counter tables
+
+Revision ID: 8d2e4b6a1c35
+Revises: 3f1c9a7d2b84
+Create Date: 2026-10-18 11:03:27.540918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e4b6a1c35'
+down_revision = '3f1c9a7d2b84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('product_sales',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('units_sold', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    with op.batch_alter_table('product_sales', schema=None) as batch_op:
+        batch_op.create_index('ix_product_sales_order_count', ['order_count'], unique=False)
+
+    op.create_table('product_sales_daily',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('units_sold', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id', 'day')
+    )
+    with op.batch_alter_table('product_sales_daily', schema=None) as batch_op:
+        batch_op.create_index('ix_product_sales_daily_day', ['day'], unique=False)
+
+    # Backfill from the orders completed so far
+    op.execute(
+        'INSERT INTO product_sales (product_id, order_count, units_sold) '
+        'SELECT order_item.product_id, count(order_item.id), coalesce(sum(order_item.quantity), 0) '
+        'FROM order_item JOIN "order" ON order_item.order_id = "order".id '
+        "WHERE \"order\".status = 'completed' "
+        'GROUP BY order_item.product_id'
+    )
+    op.execute(
+        'INSERT INTO product_sales_daily (product_id, day, order_count, units_sold) '
+        'SELECT order_item.product_id, date("order".created_at), count(order_item.id), '
+        'coalesce(sum(order_item.quantity), 0) '
+        'FROM order_item JOIN "order" ON order_item.order_id = "order".id '
+        "WHERE \"order\".status = 'completed' "
+        'GROUP BY order_item.product_id, date("order".created_at)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('product_sales_daily', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_sales_daily_day')
+
+    op.drop_table('product_sales_daily')
+    with op.batch_alter_table('product_sales', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_sales_order_count')
+
+    op.drop_table('product_sales')
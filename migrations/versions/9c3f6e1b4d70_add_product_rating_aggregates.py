@@ -0,0 +1,49 @@
+"""Add product rating aggregates and review listing index
+
+Revision ID: 9c3f6e1b4d70
+Revises: 5a7d2f9c8e16
+Create Date: 2026-10-18 16:58:02.671934
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3f6e1b4d70'
+down_revision = '5a7d2f9c8e16'
+branch_labels = None
+depends_on = None
+
+RATING_COLUMNS = ['rating_count', 'rating_sum', 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5']
+
+
+def upgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        for name in RATING_COLUMNS:
+            batch_op.add_column(sa.Column(name, sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('review', schema=None) as batch_op:
+        batch_op.create_index('ix_review_product_id_created_at_id', ['product_id', 'created_at', 'id'], unique=False)
+
+    # Backfill from the reviews written so far
+    per_star = ', '.join(
+        f'rating_{star} = (SELECT count(*) FROM review WHERE review.product_id = product.id AND review.rating = {star})'
+        for star in range(1, 6)
+    )
+    op.execute(
+        'UPDATE product SET '
+        'rating_count = (SELECT count(*) FROM review WHERE review.product_id = product.id), '
+        'rating_sum = (SELECT coalesce(sum(review.rating), 0) FROM review WHERE review.product_id = product.id), '
+        + per_star +
+        ' WHERE EXISTS (SELECT 1 FROM review WHERE review.product_id = product.id)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('review', schema=None) as batch_op:
+        batch_op.drop_index('ix_review_product_id_created_at_id')
+
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        for name in reversed(RATING_COLUMNS):
+            batch_op.drop_column(name)
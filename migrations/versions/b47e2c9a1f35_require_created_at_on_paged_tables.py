@@ -0,0 +1,38 @@
+"""Backfill and require created_at on keyset-paged tables
+
+Revision ID: b47e2c9a1f35
+Revises: 9c3f6e1b4d70
+Create Date: 2026-10-18 18:41:27.309518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b47e2c9a1f35'
+down_revision = '9c3f6e1b4d70'
+branch_labels = None
+depends_on = None
+
+# Tables paged on (created_at, id), with the value an undated row gets.
+# Undated rows predate the column default, so they sort as the oldest.
+EPOCH = "'1970-01-01 00:00:00'"
+PAGED_TABLES = {
+    'product': f'coalesce(updated_at, {EPOCH})',
+    'review': EPOCH,
+    'group_buys': EPOCH,
+}
+
+
+def upgrade():
+    for table, backfill in PAGED_TABLES.items():
+        op.execute(f'UPDATE {table} SET created_at = {backfill} WHERE created_at IS NULL')
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    for table in reversed(PAGED_TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
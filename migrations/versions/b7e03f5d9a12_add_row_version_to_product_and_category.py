@@ -0,0 +1,32 @@
+"""Add row version to product and category
+
+Revision ID: b7e03f5d9a12
+Revises: 8d2e4b6a1c35
+Create Date: 2026-10-18 13:26:50.209337
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e03f5d9a12'
+down_revision = '8d2e4b6a1c35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+    with op.batch_alter_table('category', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('category', schema=None) as batch_op:
+        batch_op.drop_column('version')
+
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_column('version')
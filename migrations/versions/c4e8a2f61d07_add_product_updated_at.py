@@ -0,0 +1,32 @@
+"""Add product updated_at change marker
+
+Revision ID: c4e8a2f61d07
+Revises: b7e03f5d9a12
+Create Date: 2026-10-18 15:02:11.480116
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8a2f61d07'
+down_revision = 'b7e03f5d9a12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE product SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_product_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_updated_at'))
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,54 @@
+"""Index hot foreign keys and filter columns
+
+Revision ID: e91b5c3d7a48
+Revises: c4e8a2f61d07
+Create Date: 2026-10-18 15:48:37.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e91b5c3d7a48'
+down_revision = 'c4e8a2f61d07'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns). cart_product.cart_id needs no index of its own:
+# it leads the table's (cart_id, product_id) primary key.
+INDEXES = [
+    ('ix_cart_user_id', 'cart', ['user_id']),
+    ('ix_order_user_id_created_at', 'order', ['user_id', 'created_at']),
+    ('ix_order_status', 'order', ['status']),
+    ('ix_order_item_order_id', 'order_item', ['order_id']),
+    ('ix_order_item_product_id', 'order_item', ['product_id']),
+    # Newest-first keyset pages, unfiltered and per category
+    ('ix_product_created_at_id', 'product', ['created_at', 'id']),
+    ('ix_product_category_id_created_at_id', 'product', ['category_id', 'created_at', 'id']),
+    ('ix_product_seller_id', 'product', ['seller_id']),
+    ('ix_group_buy_participants_group_buy_id', 'group_buy_participants', ['group_buy_id']),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY keeps the tables writable but cannot run
+        # inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False,
+                                postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)
@@ -11,5 +11,8 @@ from models.group_buy import GroupBuy
 from models.order_item import OrderItem
 from models.order import Order
 from models.product import Product
+from models.product_neighbor import ProductNeighbor
+from models.product_sales import ProductSales
+from models.product_sales_daily import ProductSalesDaily
 from models.review import Review
 from models.user import User
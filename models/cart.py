@@ -6,7 +6,7 @@ class Cart(db.Model):
     __tablename__ = 'cart'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('_user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('_user.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     checked = db.Column(db.Boolean, default=False)  # New column for checked status
     
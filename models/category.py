@@ -8,3 +8,6 @@ class Category(db.Model):
     name = db.Column(db.String(255), nullable=False)
     description = db.Column(db.String(255), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped by every UPDATE; used for ETags
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1",
+                        onupdate=db.literal_column("version + 1"))
@@ -11,7 +11,7 @@ class GroupBuy(db.Model):
     min_participants = db.Column(db.Integer, nullable=False, default=2)
     current_participants = db.Column(db.Integer, default=0)
     unique_link = db.Column(db.String(255), unique=True, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
 
     # Relationship to track product (if needed)
@@ -5,7 +5,7 @@ class GroupBuyParticipant(db.Model):
     __tablename__ = 'group_buy_participants'
 
     id = db.Column(db.Integer, primary_key=True)
-    group_buy_id = db.Column(db.Integer, db.ForeignKey('group_buys.id'), nullable=False)
+    group_buy_id = db.Column(db.Integer, db.ForeignKey('group_buys.id'), nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('_user.id'), nullable=False)
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -6,7 +6,12 @@ class Order(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('_user.id'), nullable=False)
     total_price = db.Column(db.Float, nullable=False)
-    status = db.Column(db.String(20), default="Pending")
+    status = db.Column(db.String(20), default="Pending", index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     user = db.relationship("User", backref="orders")
+
+    __table_args__ = (
+        # A user's orders, newest first
+        db.Index('ix_order_user_id_created_at', 'user_id', 'created_at'),
+    )
@@ -10,11 +10,30 @@ class Product(db.Model):
     price = db.Column(db.Float, nullable=False)
     stock = db.Column(db.Integer, default=0)
     image_url = db.Column(db.String(255), nullable=True)
-    seller_id = db.Column(db.Integer, db.ForeignKey("_user.id"), nullable=False)
+    seller_id = db.Column(db.Integer, db.ForeignKey("_user.id"), nullable=False, index=True)
     category_id = db.Column(db.Integer, db.ForeignKey("category.id"), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     uniqueLink = db.Column(db.String(50), nullable=True)
+    # Bumped by every UPDATE, ORM or Core; used for ETags and optimistic checks
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1",
+                        onupdate=db.literal_column("version + 1"))
+    # Set on insert and every UPDATE; the change marker for in-memory catalog refreshes
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    # Review aggregates, kept current by services.reviews as reviews are written
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_1 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_2 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_3 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_4 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_5 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
     seller = db.relationship("User", backref="products")
     category = db.relationship("Category", backref="products")
+
+    __table_args__ = (
+        # Newest-first keyset pages, unfiltered and per category
+        db.Index("ix_product_created_at_id", "created_at", "id"),
+        db.Index("ix_product_category_id_created_at_id", "category_id", "created_at", "id"),
+    )
@@ -0,0 +1,15 @@
+from models import db
+
+# "Customers also bought": how many completed orders contained both products,
+# kept for each product's top neighbours only. Maintained by services.recommendations
+class ProductNeighbor(db.Model):
+    __tablename__ = 'product_neighbors'
+
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id', ondelete='CASCADE'), primary_key=True)
+    neighbor_id = db.Column(db.Integer, db.ForeignKey('product.id', ondelete='CASCADE'), primary_key=True)
+    co_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # One product's neighbours, most bought together first
+        db.Index('ix_product_neighbors_product_id_co_count', 'product_id', 'co_count'),
+    )
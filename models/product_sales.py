@@ -0,0 +1,15 @@
+from models import db
+from datetime import datetime
+
+# Running totals of completed-order sales per product, maintained by services.best_sellers
+class ProductSales(db.Model):
+    __tablename__ = 'product_sales'
+
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id', ondelete='CASCADE'), primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)  # completed order lines
+    units_sold = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_product_sales_order_count', 'order_count'),
+    )
@@ -0,0 +1,14 @@
+from models import db
+
+# Per-day sales per product, used for time-windowed best sellers
+class ProductSalesDaily(db.Model):
+    __tablename__ = 'product_sales_daily'
+
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    units_sold = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_product_sales_daily_day', 'day'),
+    )
@@ -7,7 +7,12 @@ class Review(db.Model):
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
     rating = db.Column(db.Integer, nullable=False)  # 1-5 stars
     comment = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     user = db.relationship("User", backref="reviews")
     product = db.relationship("Product", backref="reviews")
+
+    __table_args__ = (
+        # A product's reviews, newest first
+        db.Index('ix_review_product_id_created_at_id', 'product_id', 'created_at', 'id'),
+    )
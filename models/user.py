@@ -26,8 +26,12 @@ class User(UserMixin, db.Model):
     def check_password(self, password):
         return bcrypt.check_password_hash(self.password_hash, password)
     
+    @staticmethod
+    def credits_for(purchase_amount, credit_rate=0.01):
+        return purchase_amount * credit_rate
+
     def award_credits(self, purchase_amount, credit_rate=0.01):
-        credits_earned = purchase_amount * credit_rate
+        credits_earned = self.credits_for(purchase_amount, credit_rate)
         self.credits += credits_earned
         return credits_earned
 
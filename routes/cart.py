@@ -4,9 +4,55 @@ from models.product import Product
 from models.cart_product import CartProduct
 from models import db
 from models.user import User
+from services.cart import add_quantity, create_cart, find_cart_owner, first_cart_id, user_cart
+from services.catalog_events import stock_changed
+from services.checkout import award_credits, checkout_lines, clear_cart, create_order, decrement_stock, record_order
+from services.post_commit import after_response
+from services.product_cache import product_cache
 
 cart_bp = Blueprint('cart_bp', __name__)
 
+def cart_lines(cart_id):
+    """Return (cart item, cached product snapshot) pairs for a cart, skipping deleted products."""
+    cart_items = CartProduct.query.filter_by(cart_id=cart_id).all()
+    products = product_cache.get_many(item.product_id for item in cart_items)
+    lines = []
+    for item in cart_items:
+        product = products.get(item.product_id)
+        if product:
+            lines.append((item, product))
+        else:
+            print(f"Warning: Product {item.product_id} not found for cart item")
+    return lines
+
+def cart_view_select(email):
+    """
+    One SELECT over _user, cart, cart_product and product for the cart page.
+
+    Everything is outer joined from the user, so an unknown email returns no
+    rows, a user without a cart one row with a NULL cart_id, and otherwise
+    one row per cart line. A line whose product is gone has a NULL name.
+    """
+    first_cart = first_cart_id()
+    return (
+        db.select(
+            User.id.label('user_id'),
+            Cart.id.label('cart_id'),
+            CartProduct.product_id,
+            CartProduct.quantity,
+            Product.name.label('product_name'),
+            Product.price,
+            Product.image_url,
+            Product.stock,
+        )
+        .select_from(User)
+        .outerjoin(Cart, Cart.id == first_cart)
+        .outerjoin(CartProduct, CartProduct.cart_id == Cart.id)
+        .outerjoin(Product, Product.id == CartProduct.product_id)
+        .where(User.email == email)
+        .order_by(CartProduct.product_id)
+    )
+
 COUPONS = {
     "P1Q8": {
         "discount_percentage": 15,  # 15% discount
@@ -40,45 +86,43 @@ def get_cart():
         if not email:
             return jsonify({'error': 'Email is required'}), 400
             
-        user = verify_user_email(email)
-        if not user:
-            return jsonify({'error': 'Invalid email'}), 400
-        print(f"User verified: {user.id}")
-
-        cart = Cart.query.filter_by(user_id=user.id).first()
-        if not cart:
-            print(f"No cart found for user {user.id}")
-            return jsonify([]), 200
-        print(f"Cart found: {cart.id}")
-        
         try:
-            cart_items = CartProduct.query.filter_by(cart_id=cart.id).all()
-            print(f"Found {len(cart_items)} items in cart")
-            
-            results = []
-            for item in cart_items:
-                product = Product.query.get(item.product_id)
-                if product:
-                    results.append({
-                        'cart_id': cart.id,
-                        'product_id': product.id,
-                        'quantity': item.quantity,
-                        'product_name': product.name,  
-                        'price': product.price,
-                        'image_url': product.image_url,
-                        'stock': product.stock
-                    })
-                else:
-                    print(f"Warning: Product {item.product_id} not found for cart item")
-            
-            return jsonify(results), 200
-            
+            rows = db.session.execute(cart_view_select(email)).all()
         except Exception as e:
             print(f"Error querying cart items: {str(e)}")
             return jsonify({
                 'error': 'Failed to retrieve cart items',
                 'message': str(e)
             }), 500
+
+        if not rows:
+            return jsonify({'error': 'Invalid email'}), 400
+        print(f"User verified: {rows[0].user_id}")
+
+        if rows[0].cart_id is None:
+            print(f"No cart found for user {rows[0].user_id}")
+            return jsonify([]), 200
+        print(f"Cart found: {rows[0].cart_id}")
+
+        results = []
+        for row in rows:
+            if row.product_id is None:
+                continue
+            if row.product_name is None:
+                print(f"Warning: Product {row.product_id} not found for cart item")
+                continue
+            results.append({
+                'cart_id': row.cart_id,
+                'product_id': row.product_id,
+                'quantity': row.quantity,
+                'product_name': row.product_name,
+                'price': row.price,
+                'image_url': row.image_url,
+                'stock': row.stock
+            })
+        print(f"Found {len(results)} items in cart")
+
+        return jsonify(results), 200
             
     except Exception as e:
         print(f"Unexpected error in get_cart: {str(e)}")
@@ -87,6 +131,123 @@ def get_cart():
             'message': str(e)
         }), 500
 
+def add_to_cart_fast(email, product_id, quantity):
+    """Add a positive quantity with one lookup and one guarded upsert, creating the cart in the same transaction."""
+    owner = find_cart_owner(email) if email else None
+    if not owner:
+        return jsonify({'error': 'Invalid email'}), 400
+
+    cart_id = owner.cart_id or create_cart(owner.user_id)
+    total = add_quantity(cart_id, product_id, quantity)
+    if total is None:
+        db.session.rollback()
+        product = db.session.execute(db.select(Product.stock).where(Product.id == product_id)).first()
+        if not product:
+            return jsonify({'error': 'Product not found'}), 404
+        if product.stock < quantity:
+            return jsonify({'error': 'Not enough stock available'}), 400
+        return jsonify({'error': 'Not enough stock available for the total quantity'}), 400
+    db.session.commit()
+
+    if total == quantity:
+        message = f'Product added to cart. Quantity: {quantity}'
+    else:
+        message = f'Quantity increased. New total: {total}'
+    return jsonify({
+        'message': message,
+        'cart_id': cart_id,
+        'product_id': product_id,
+        'quantity': total
+    }), 200
+
+def add_to_cart_general(email, product_id, quantity):
+    """Add to, reduce or remove a cart line through the ORM; any quantity, including negative ones."""
+    print(f"Attempting to verify email: {email}")
+    user = verify_user_email(email)
+    if not user:
+        return jsonify({'error': 'Invalid email'}), 400
+    print(f"User verified: {user.id}")
+    
+    # Ensure the product exists and check stock availability
+    product = Product.query.get(product_id)
+    if not product:
+        return jsonify({'error': 'Product not found'}), 404
+    print(f"Product found: {product.id}, Stock: {product.stock}")
+        
+    if product.stock < quantity:
+        return jsonify({'error': 'Not enough stock available'}), 400
+    
+    # Check if the user has a cart
+    cart = user_cart(user.id)
+    if not cart:
+        print(f"Creating new cart for user {user.id}")
+        cart = Cart(user_id=user.id)
+        db.session.add(cart)
+        try:
+            db.session.commit()
+            print("New cart created successfully")
+        except Exception as e:
+            print(f"Error creating cart: {str(e)}")
+            db.session.rollback()
+            return jsonify({'error': 'Failed to create cart', 'message': str(e)}), 500
+    
+    # Check if the product is already in the cart
+    try:
+        final_quantity = quantity  # Initialize final quantity
+        association = CartProduct.query.filter_by(cart_id=cart.id, product_id=product_id).first()
+        
+        if association:
+            print(f"Updating existing cart item. Old quantity: {association.quantity}")
+            if quantity < 0:
+                # If quantity is negative, reduce the existing quantity
+                new_quantity = association.quantity + quantity  # Adding negative number reduces it
+                if new_quantity <= 0:
+                    # If reducing to 0 or less, remove the item
+                    CartProduct.query.filter_by(cart_id=cart.id, product_id=product_id).delete()
+                    message = 'Item removed from cart'
+                    final_quantity = 0
+                else:
+                    # Otherwise, update the quantity
+                    association.quantity = new_quantity
+                    final_quantity = new_quantity
+                    message = f'Quantity reduced. Remaining: {final_quantity}'
+            else:
+                # If quantity is positive, add to existing quantity
+                association.quantity += quantity
+                final_quantity = association.quantity
+                message = f'Quantity increased. New total: {final_quantity}'
+        else:
+            # If product is not in cart and quantity is negative, return error
+            if quantity < 0:
+                return jsonify({'error': 'Cannot reduce quantity of item not in cart'}), 400
+            # Otherwise, add new item
+            print("Adding new product to cart")
+            new_assoc = CartProduct(cart_id=cart.id, product_id=product_id, quantity=quantity)
+            db.session.add(new_assoc)
+            message = f'Product added to cart. Quantity: {quantity}'
+        
+        # Check if the final quantity exceeds available stock (only for positive quantities)
+        if final_quantity > product.stock:
+            return jsonify({'error': 'Not enough stock available for the total quantity'}), 400
+        
+        db.session.commit()
+        print("Cart updated successfully")
+
+        return jsonify({
+            'message': message,
+            'cart_id': cart.id,
+            'product_id': product_id,
+            'quantity': final_quantity
+        }), 200
+        
+    except Exception as e:
+        print(f"Error updating cart: {str(e)}")
+        db.session.rollback()
+        return jsonify({
+            'error': 'Failed to update cart',
+            'message': str(e)
+        }), 500
+
 # POST /cart - Add a product to the cart (or update quantity if already in cart)
 @cart_bp.route('', methods=['POST'])
 def add_to_cart():
@@ -111,92 +272,10 @@ def add_to_cart():
             return jsonify({'error': 'quantity must be an integer'}), 400
             
         email = data.get('email')
-        print(f"Attempting to verify email: {email}")
-        user = verify_user_email(email)
-        if not user:
-            return jsonify({'error': 'Invalid email'}), 400
-        print(f"User verified: {user.id}")
-        
-        # Ensure the product exists and check stock availability
-        product = Product.query.get(product_id)
-        if not product:
-            return jsonify({'error': 'Product not found'}), 404
-        print(f"Product found: {product.id}, Stock: {product.stock}")
-            
-        if product.stock < quantity:
-            return jsonify({'error': 'Not enough stock available'}), 400
-        
-        # Check if the user has a cart
-        cart = Cart.query.filter_by(user_id=user.id).first()
-        if not cart:
-            print(f"Creating new cart for user {user.id}")
-            cart = Cart(user_id=user.id)
-            db.session.add(cart)
-            try:
-                db.session.commit()
-                print("New cart created successfully")
-            except Exception as e:
-                print(f"Error creating cart: {str(e)}")
-                db.session.rollback()
-                return jsonify({'error': 'Failed to create cart', 'message': str(e)}), 500
-        
-        # Check if the product is already in the cart
-        try:
-            final_quantity = quantity  # Initialize final quantity
-            association = CartProduct.query.filter_by(cart_id=cart.id, product_id=product_id).first()
-            
-            if association:
-                print(f"Updating existing cart item. Old quantity: {association.quantity}")
-                if quantity < 0:
-                    # If quantity is negative, reduce the existing quantity
-                    new_quantity = association.quantity + quantity  # Adding negative number reduces it
-                    if new_quantity <= 0:
-                        # If reducing to 0 or less, remove the item
-                        CartProduct.query.filter_by(cart_id=cart.id, product_id=product_id).delete()
-                        message = 'Item removed from cart'
-                        final_quantity = 0
-                    else:
-                        # Otherwise, update the quantity
-                        association.quantity = new_quantity
-                        final_quantity = new_quantity
-                        message = f'Quantity reduced. Remaining: {final_quantity}'
-                else:
-                    # If quantity is positive, add to existing quantity
-                    association.quantity += quantity
-                    final_quantity = association.quantity
-                    message = f'Quantity increased. New total: {final_quantity}'
-            else:
-                # If product is not in cart and quantity is negative, return error
-                if quantity < 0:
-                    return jsonify({'error': 'Cannot reduce quantity of item not in cart'}), 400
-                # Otherwise, add new item
-                print("Adding new product to cart")
-                new_assoc = CartProduct(cart_id=cart.id, product_id=product_id, quantity=quantity)
-                db.session.add(new_assoc)
-                message = f'Product added to cart. Quantity: {quantity}'
-            
-            # Check if the final quantity exceeds available stock (only for positive quantities)
-            if final_quantity > product.stock:
-                return jsonify({'error': 'Not enough stock available for the total quantity'}), 400
-            
-            db.session.commit()
-            print("Cart updated successfully")
+        if quantity > 0:
+            return add_to_cart_fast(email, product_id, quantity)
+        return add_to_cart_general(email, product_id, quantity)
 
-            return jsonify({
-                'message': message,
-                'cart_id': cart.id,
-                'product_id': product_id,
-                'quantity': final_quantity
-            }), 200
-            
-        except Exception as e:
-            print(f"Error updating cart: {str(e)}")
-            db.session.rollback()
-            return jsonify({
-                'error': 'Failed to update cart',
-                'message': str(e)
-            }), 500
-        
     except Exception as e:
         print(f"Unexpected error in add_to_cart: {str(e)}")
         if 'db' in locals():
@@ -278,18 +357,17 @@ def checkout():
     # Retrieve optional credits to apply from request body
     credits_to_apply = float(data.get('credits_to_apply', 0.0))
     
-    cart = Cart.query.filter_by(user_id=user.id).first()
+    cart = user_cart(user.id)
     if not cart:
         return jsonify({'message': 'Cart is empty'}), 400
     
-    cart_items = db.session.query(CartProduct).filter_by(cart_id=cart.id).all()
-    if not cart_items:
+    lines = checkout_lines(cart.id)
+    if not lines:
         return jsonify({'message': 'Cart is empty'}), 400
 
     total_price = 0
-    for item in cart_items:
-        product = Product.query.get(item.product_id)
-        total_price += product.price * item.quantity
+    for line in lines:
+        total_price += line.price * line.quantity
 
     if credits_to_apply > 0:
         # Validate that the user has enough credits
@@ -301,30 +379,38 @@ def checkout():
         total_price -= applicable_credits
         user.credits -= applicable_credits
 
-    for item in cart_items:
-        product = Product.query.get(item.product_id)
-        if product.stock < item.quantity:
-            return jsonify({
-                'error': f'Not enough stock for {product.name}. Available: {product.stock}'
-            }), 400
+    # Stock is checked and taken by the same UPDATE, so concurrent checkouts can't oversell
+    short = decrement_stock({line.product_id: line.quantity for line in lines})
+    if short:
+        db.session.rollback()
+        product = db.session.execute(
+            db.select(Product.name, Product.stock).where(Product.id == short[0])
+        ).first()
+        return jsonify({
+            'error': f'Not enough stock for {product.name}. Available: {product.stock}'
+        }), 400
 
-    for item in cart_items:
-        product = Product.query.get(item.product_id)
-        product.stock -= item.quantity
-        # Remove the association via ORM
-        CartProduct.query.filter_by(cart_id=cart.id, product_id=item.product_id).delete()
+    clear_cart(cart.id)
+    order_id = create_order(user.id, lines, total_price)
 
-    credits_earned = user.award_credits(total_price)
+    # Credits are granted after the response goes out; report what they will be
+    credits_earned = User.credits_for(total_price)
+    remaining_credits = user.credits + credits_earned
     
     # Set the checked status to True after successful checkout
     cart.checked = True
+    purchased_ids = [line.product_id for line in lines]
     db.session.commit()
+    stock_changed(purchased_ids)
+    after_response(award_credits, user.id, credits_earned)
+    after_response(record_order, order_id)
 
     return jsonify({
         'message': 'Checkout successful',
+        'order_id': order_id,
         'final_total': total_price,
         'credits_earned': credits_earned,
-        'remaining_credits': user.credits
+        'remaining_credits': remaining_credits
     }), 200
 
 @cart_bp.route('/apply-coupon', methods=['POST'])
@@ -350,17 +436,16 @@ def apply_coupon():
         return jsonify({"error": "This coupon has already been used"}), 400
 
     # 3) Calculate the user's cart total
-    cart = Cart.query.filter_by(user_id=user.id).first()
+    cart = user_cart(user.id)
     if not cart:
         return jsonify({"error": "Cart is empty"}), 400
     
-    cart_items = db.session.query(CartProduct).filter_by(cart_id=cart.id).all()
-    if not cart_items:
+    lines = cart_lines(cart.id)
+    if not lines:
         return jsonify({"error": "Cart is empty"}), 400
 
     total_price = 0
-    for item in cart_items:
-        product = Product.query.get(item.product_id)
+    for item, product in lines:
         total_price += product.price * item.quantity
 
     # 4) Apply the discount
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_login import current_user, login_required
 from models import db
 from models.group_buy import GroupBuy
@@ -10,6 +10,10 @@ import random
 import string
 import secrets
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from services.catalog import product_select, products_by_ids, serialize_products
+from services.catalog_events import products_changed
+from services.catalog_snapshot import catalog_snapshot, use_catalog_snapshot
+from services.pagination import InvalidCursor, page_args, paginate_keyset
 
 def generate_unique_link():
     """Generate a unique link for the group buy."""
@@ -21,6 +25,9 @@ def generate_unique_link():
 
 groupbuy_bp = Blueprint('groupbuy_bp', __name__)
 
+# Columns read by the group-buy product list
+GROUP_BUY_FIELDS = ("id", "name", "description", "price", "stock", "image_url", "category")
+
 @groupbuy_bp.route('/create', methods=['POST'])
 def create_group_buy():
     """Create a new group buy."""
@@ -72,6 +79,7 @@ def create_group_buy():
         
         db.session.add(group_buy)
         db.session.commit()
+        products_changed([product.id])
         
         return jsonify({
             'message': 'Group buy created successfully',
@@ -83,7 +91,7 @@ def create_group_buy():
                 'current_participants': 0,
                 'discount_percentage': group_buy.discount_percentage,
                 'unique_link': unique_link,
-                'end_date': group_buy.end_date.isoformat() if group_buy.end_date else None,
+                'end_date': group_buy.end_date,
                 'status': 'active'
             }
         }), 201
@@ -99,19 +107,23 @@ def get_available_products():
     Get list of products available for group buy.
     """
     try:
-        # Get all products that are in stock
-        products = Product.query.filter(Product.stock > 0).all()
+        limit, cursor = page_args(request.args)
+
+        # Get a page of products that are in stock
+        if use_catalog_snapshot(current_app):
+            product_ids, next_cursor = catalog_snapshot.page(limit, cursor, in_stock=True)
+            rows = products_by_ids(product_ids, GROUP_BUY_FIELDS)
+        else:
+            rows, next_cursor = paginate_keyset(
+                product_select(GROUP_BUY_FIELDS).filter(Product.stock > 0), Product, limit, cursor
+            )
         
-        return jsonify([{
-            "id": product.id,
-            "name": product.name,
-            "description": product.description,
-            "price": product.price,
-            "stock": product.stock,
-            "image_url": product.image_url,
-            "category": product.category.name if product.category else None
-        } for product in products]), 200
+        return jsonify({
+            "products": serialize_products(rows, GROUP_BUY_FIELDS), "next_cursor": next_cursor
+        }), 200
         
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1,29 +1,34 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
 from models.product import Product  # Import product model
 from models.category import Category  # Import category model
-from models.order import Order  # Import order model (for best sellers)
-from models.order_item import OrderItem  # Import order model (for best sellers)
 from models.user import User  # If you want personalized recommendations
 from models import db  # Database instance
 from sqlalchemy.exc import SQLAlchemyError
+from services.best_sellers import best_sellers_query
+from services.catalog import (
+    BASIC_FIELDS, DETAIL_FIELDS, LISTING_FIELDS, SEARCH_FIELDS, parse_fields, product_select, products_by_ids,
+    serialize_products
+)
+from services.catalog_snapshot import catalog_snapshot, use_catalog_snapshot
+from services.conditional import not_modified, product_etag, rows_etag
+from services.facets import compute_facets, parse_price_buckets
+from services.product_cache import product_cache
+from services.recommendations import NEIGHBORS_KEPT, related_products_query
+from services.response_cache import HOMEPAGE_CACHE_KEY, cached_response
+from services.pagination import InvalidCursor, page_args, paginate_keyset
+from services.search import apply_text_search
+from services.search_index import search_index, use_search_index
+from services.suggest import suggest_index
 
 home_bp = Blueprint("home", __name__)
 
-def serialize_product(product: Product) -> Dict[str, Any]:
-    """Serialize a product object to a dictionary."""
-    return {
-        "id": product.id,
-        "name": product.name,
-        "description": product.description,
-        "price": product.price,
-        "stock": product.stock,
-        "image_url": product.image_url,
-        "seller_id": product.seller_id,
-        "category_id": product.category_id,
-        "created_at": product.created_at.isoformat() if product.created_at else None
-    }
+# Rows fetched per server-side cursor round trip during a catalog export
+EXPORT_BATCH_SIZE = 1000
+
+# Columns compute_facets reads from every search match
+FACET_FIELDS = ('category_id', 'category_name', 'price')
 
 def serialize_category(category: Category) -> Dict[str, Any]:
     """Serialize a category object to a dictionary."""
@@ -34,6 +39,7 @@ def serialize_category(category: Category) -> Dict[str, Any]:
     }
 
 @home_bp.route("/latest", methods=["GET"])
+@cached_response(HOMEPAGE_CACHE_KEY, "HOMEPAGE_CACHE_TTL")
 def homepage() -> tuple[Dict[str, Any], int]:
     """
     Get featured products, categories, and best sellers for the homepage.
@@ -42,25 +48,22 @@ def homepage() -> tuple[Dict[str, Any], int]:
         tuple: (JSON response, HTTP status code)
     """
     try:
-        featured_products = Product.query.order_by(Product.created_at.desc()).limit(5).all()
+        featured_products = db.session.execute(
+            product_select(BASIC_FIELDS).order_by(Product.created_at.desc()).limit(5)
+        ).all()
         categories = Category.query.limit(5).all()
         
-        # Optimized best sellers query with proper joins
-        best_sellers = (
-            db.session.query(Product)
-            .join(OrderItem, OrderItem.product_id == Product.id)
-            .join(Order, OrderItem.order_id == Order.id)
-            .filter(Order.status == 'completed')  # Only count completed orders
-            .group_by(Product.id)
-            .order_by(db.func.count(OrderItem.id).desc())
-            .limit(5)
-            .all()
-        )
+        # Top-N read from the sales counters kept up to date as orders complete
+        best_sellers = db.session.execute(
+            best_sellers_query(
+                current_app.config.get("BEST_SELLERS_WINDOW_DAYS", 0), product_select(BASIC_FIELDS)
+            ).limit(5)
+        ).all()
 
         response = {
-            "featured_products": [serialize_product(product) for product in featured_products],
+            "featured_products": serialize_products(featured_products, BASIC_FIELDS),
             "categories": [serialize_category(category) for category in categories],
-            "best_sellers": [serialize_product(product) for product in best_sellers],
+            "best_sellers": serialize_products(best_sellers, BASIC_FIELDS),
         }
 
         return jsonify(response), 200
@@ -72,34 +75,72 @@ def all_products():
     try:
         # Get category filter from query parameters
         category_id = request.args.get('category', type=int)
+        limit, cursor = page_args(request.args)
+        fields = parse_fields(request.args.get('fields'), LISTING_FIELDS)
         
-        # Base query
-        query = Product.query
-        
-        # Apply category filter if provided
-        if category_id:
-            query = query.filter_by(category_id=category_id)
-        
-        products = query.all()
-        product_list = []
-        for product in products:
-            product_list.append({
-                "id": product.id,
-                "name": product.name,
-                "description": product.description,
-                "price": product.price,
-                "stock": product.stock,
-                "image_url": product.image_url,
-                "seller_id": product.seller_id,
-                "category_id": product.category_id,
-                "category_name": product.category.name if product.category else None,
-                "created_at": product.created_at.isoformat() if product.created_at else None,
-                "uniqueLink": product.uniqueLink
-            })
-        return jsonify(product_list), 200
+        if use_catalog_snapshot(current_app):
+            # Filter and page in memory, then read only this page's rows
+            product_ids, next_cursor = catalog_snapshot.page(limit, cursor, category_id=category_id)
+            rows = products_by_ids(product_ids, fields)
+        else:
+            # Base query, selecting only the requested fields
+            query = product_select(fields)
+            
+            # Apply category filter if provided
+            if category_id:
+                query = query.filter(Product.category_id == category_id)
+            
+            rows, next_cursor = paginate_keyset(query, Product, limit, cursor)
+        product_list = serialize_products(rows, fields)
+        return jsonify({"products": product_list, "next_cursor": next_cursor}), 200
+    except (InvalidCursor, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@home_bp.route("/export", methods=["GET"])
+def export_products():
+    """
+    Stream the full catalog for downstream syncs.
+
+    Query Parameters:
+        format (str): "ndjson" (default, one product per line) or "json" (a single array)
+
+    Rows are read through a server-side cursor in batches of EXPORT_BATCH_SIZE
+    and written out as each batch arrives, so memory stays flat however large
+    the catalog is.
+    """
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in ("ndjson", "json"):
+        return jsonify({"error": "format must be 'ndjson' or 'json'"}), 400
+
+    statement = (
+        product_select(LISTING_FIELDS)
+        .order_by(Product.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    def generate():
+        result = db.session.execute(statement)
+        if export_format == "json":
+            yield "["
+        first = True
+        for partition in result.partitions():
+            lines = [
+                current_app.json.dumps(product, separators=(",", ":"), sort_keys=False)
+                for product in serialize_products(partition, LISTING_FIELDS)
+            ]
+            if export_format == "ndjson":
+                yield "\n".join(lines) + "\n"
+            else:
+                yield ("" if first else ",") + ",".join(lines)
+            first = False
+        if export_format == "json":
+            yield "]"
+
+    mimetype = "application/x-ndjson" if export_format == "ndjson" else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
 # Route to retrieve all categories
 @home_bp.route("/categories", methods=["GET"])
 def get_categories() -> tuple[Dict[str, Any], int]:
@@ -110,8 +151,20 @@ def get_categories() -> tuple[Dict[str, Any], int]:
         tuple: (JSON response, HTTP status code)
     """
     try:
-        categories = Category.query.all()
-        return jsonify([serialize_category(category) for category in categories]), 200
+        categories = Category.query.order_by(Category.id).all()
+        # Every insert, update or delete changes some (id, version, created_at),
+        # including a new row that reuses a deleted row's id
+        etag = rows_etag(
+            "categories",
+            ((category.id, category.version, category.created_at) for category in categories)
+        )
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
+        response = jsonify([serialize_category(category) for category in categories])
+        response.set_etag(etag)
+        return response, 200
     except SQLAlchemyError as e:
         return jsonify({"error": "Database error occurred"}), 500
 
@@ -201,27 +254,88 @@ def get_product_details(product_id):
         JSON response with product details
     """
     try:
-        product = Product.query.get_or_404(product_id)
+        try:
+            fields = parse_fields(request.args.get("fields"), DETAIL_FIELDS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        variant = fields if fields != DETAIL_FIELDS else None
+
+        # The payload shows the category and seller names, so their changes move the tag too
+        versions = db.session.execute(
+            db.select(Product.version, Category.version, User.username)
+            .select_from(Product)
+            .outerjoin(Category, Product.category_id == Category.id)
+            .outerjoin(User, Product.seller_id == User.id)
+            .where(Product.id == product_id)
+        ).first()
+        if versions is None:
+            return jsonify({"error": "Product not found"}), 404
+        etag = product_etag(product_id, versions[0], variant, related=versions[1:])
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
+        row = db.session.execute(product_select(fields).where(Product.id == product_id)).first()
+        if row is None:
+            return jsonify({"error": "Product not found"}), 404
         
-        return jsonify({
-            "id": product.id,
-            "name": product.name,
-            "description": product.description,
-            "price": product.price,
-            "stock": product.stock,
-            "image_url": product.image_url,
-            "seller_id": product.seller_id,
-            "category_id": product.category_id,
-            "category_name": product.category.name if product.category else None,
-            "created_at": product.created_at.isoformat() if product.created_at else None,
-            "seller_name": product.seller.username if product.seller else None,
-            "average_rating": product.average_rating if hasattr(product, 'average_rating') else None,
-            "review_count": product.review_count if hasattr(product, 'review_count') else 0,
-            "uniqueLink": product.uniqueLink
-        }), 200
+        response = jsonify(serialize_products([row], fields)[0])
+        response.set_etag(etag)
+        return response, 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@home_bp.route("/product/<int:product_id>/related", methods=["GET"])
+def related_products(product_id):
+    """
+    Products most often bought together with a product.
+
+    Query Parameters:
+        limit (int): Products to return, default 10
+        fields (str): Comma separated subset of the /home product fields
+
+    Returns:
+        tuple: (JSON response, HTTP status code)
+    """
+    try:
+        fields = parse_fields(request.args.get("fields"), LISTING_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    limit = max(1, min(request.args.get("limit", 10, type=int), NEIGHBORS_KEPT))
+
+    try:
+        if product_cache.get(product_id) is None:
+            return jsonify({"error": "Product not found"}), 404
+        rows = db.session.execute(
+            related_products_query(product_id, product_select(fields)).limit(limit)
+        ).all()
+        return jsonify({"products": serialize_products(rows, fields)}), 200
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({"error": "Database error occurred"}), 500
+
+@home_bp.route("/suggest", methods=["GET"])
+def suggest():
+    """
+    Autocomplete product and category names.
+
+    Query Parameters:
+        q (str): The prefix typed so far
+        limit (int): Suggestions per kind, default 10, maximum 20
+
+    Returns:
+        tuple: (JSON response, HTTP status code)
+    """
+    prefix = request.args.get("q", "").strip()
+    if not prefix:
+        return jsonify({"products": [], "categories": []}), 200
+    try:
+        limit = request.args.get("limit", 10, type=int)
+        return jsonify(suggest_index.suggest(prefix, limit)), 200
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({"error": "Database error occurred"}), 500
+
 # GET /search - Search for products
 @home_bp.route('/search', methods=['GET'])
 def search_products():
@@ -231,48 +345,61 @@ def search_products():
         category = request.args.get('category', type=int)
         min_price = request.args.get('min_price', type=float)
         max_price = request.args.get('max_price', type=float)
+        match_all = request.args.get('mode', 'all') != 'any'
+        with_facets = request.args.get('facets', '').lower() in ('1', 'true', 'yes')
+        try:
+            price_edges = parse_price_buckets(request.args.get('price_buckets'))
+        except ValueError as e:
+            return jsonify({'error': 'Invalid price_buckets', 'message': str(e)}), 400
+        try:
+            fields = parse_fields(request.args.get('fields'), SEARCH_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': 'Invalid fields', 'message': str(e)}), 400
+
+        # Facets read these whatever the client asked to see
+        load_fields = fields
+        if with_facets:
+            load_fields += tuple(name for name in FACET_FIELDS if name not in fields)
 
-        # Build the base query
-        base_query = Product.query
-
-        # Apply search filters
-        if query:
-            # Search in product name and description
-            base_query = base_query.filter(
-                db.or_(
-                    Product.name.ilike(f'%{query}%'),
-                    Product.description.ilike(f'%{query}%')
-                )
+        if query and use_search_index(current_app):
+            ranked = search_index.search(
+                query, match_all=match_all, category_id=category,
+                min_price=min_price, max_price=max_price
             )
+            products = products_by_ids([product_id for product_id, _ in ranked], load_fields)
+        else:
+            # Build the base query
+            base_query = product_select(load_fields)
+            order_by = Product.id
+
+            # Apply search filters
+            if query:
+                # Full-text search in product name and description, best match first
+                base_query, order_by = apply_text_search(base_query, query, match_all)
 
-        if category:
-            base_query = base_query.filter(Product.category_id == category)
+            if category:
+                base_query = base_query.filter(Product.category_id == category)
 
-        if min_price is not None:
-            base_query = base_query.filter(Product.price >= min_price)
+            if min_price is not None:
+                base_query = base_query.filter(Product.price >= min_price)
 
-        if max_price is not None:
-            base_query = base_query.filter(Product.price <= max_price)
+            if max_price is not None:
+                base_query = base_query.filter(Product.price <= max_price)
 
-        # Get all matching products
-        products = base_query.all()
+            # Get all matching products
+            products = db.session.execute(base_query.order_by(order_by)).all()
 
         # Format the response
-        results = []
-        for product in products:
-            results.append({
-                'id': product.id,
-                'name': product.name,
-                'description': product.description,
-                'price': product.price,
-                'stock': product.stock,
-                'image_url': product.image_url,
-                'category_id': product.category_id,
-                'category_name': product.category.name if product.category else None,
-                'created_at': product.created_at.isoformat() if product.created_at else None
-            })
-
-        return jsonify(results), 200
+        results = serialize_products(products, fields)
+        if not with_facets:
+            return jsonify(results), 200
+
+        # Every match is already loaded, so facets are one pass over it
+        facets = compute_facets(
+            ((row.category_id, row.category_name, row.price) for row in products),
+            price_edges
+        )
+        return jsonify({'products': results, 'facets': facets}), 200
 
     except Exception as e:
         print(f"Error in search_products: {str(e)}")
@@ -280,5 +407,3 @@ def search_products():
             'error': 'Failed to search products',
             'message': str(e)
         }), 500
-
-
@@ -38,7 +38,7 @@ def get_user_orders():
             # Format order details
             order_list.append({
                 "order_id": order.id,
-                "created_at": order.created_at.isoformat(),
+                "created_at": order.created_at,
                 "total_amount": order.total_amount,
                 "status": order.status,
                 "items": items,
@@ -85,7 +85,7 @@ def get_order_details(order_id):
         # Format order details
         order_details = {
             "order_id": order.id,
-            "created_at": order.created_at.isoformat(),
+            "created_at": order.created_at,
             "total_amount": order.total_amount,
             "status": order.status,
             "items": items,
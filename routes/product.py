@@ -1,7 +1,17 @@
 from flask import Blueprint, request, jsonify
 from models.product import Product
+from models.review import Review
+from models.user import User
 from models import db
 from datetime import datetime
+from services.catalog import BASIC_FIELDS, parse_fields, product_select, serialize_products
+from services.catalog_events import products_changed, ratings_changed
+from services.conditional import not_modified, product_etag
+from services.product_batch import MAX_BATCH_UPDATES, apply_batch_updates
+from services.product_cache import product_cache
+from services.reviews import RATINGS, add_review, review_select, serialize_reviews
+from services.product_import import IMPORT_FORMATS, import_products
+from services.pagination import InvalidCursor, page_args, paginate_keyset
 
 product_bp = Blueprint('product_bp', __name__)
 
@@ -10,7 +20,12 @@ product_bp = Blueprint('product_bp', __name__)
 def list_products():
     search = request.args.get('search')
     category_id = request.args.get('category_id')
-    query = Product.query
+    limit, cursor = page_args(request.args)
+    try:
+        fields = parse_fields(request.args.get('fields'), BASIC_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    query = product_select(fields)
 
     if search:
         like_pattern = f"%{search}%"
@@ -18,37 +33,69 @@ def list_products():
     if category_id:
         query = query.filter(Product.category_id == category_id)
 
-    products = query.all()
-    results = []
-    for p in products:
-        results.append({
-            'id': p.id,
-            'name': p.name,
-            'description': p.description,
-            'price': p.price,
-            'stock': p.stock,
-            'image_url': p.image_url,
-            'seller_id': p.seller_id,
-            'category_id': p.category_id,
-            'created_at': p.created_at.isoformat() if p.created_at else None
-        })
-    return jsonify(results), 200
+    try:
+        rows, next_cursor = paginate_keyset(query, Product, limit, cursor)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    results = serialize_products(rows, fields)
+    return jsonify({'products': results, 'next_cursor': next_cursor}), 200
 
 # GET /products/<id> - Retrieve a specific product
 @product_bp.route('/<int:id>', methods=['GET'])
 def get_product(id):
-    product = Product.query.get_or_404(id)
-    return jsonify({
-        'id': product.id,
-        'name': product.name,
-        'description': product.description,
-        'price': product.price,
-        'stock': product.stock,
-        'image_url': product.image_url,
-        'seller_id': product.seller_id,
-        'category_id': product.category_id,
-        'created_at': product.created_at.isoformat() if product.created_at else None
-    }), 200
+    try:
+        fields = parse_fields(request.args.get('fields'), BASIC_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    variant = fields if fields != BASIC_FIELDS else None
+
+    product = product_cache.get(id)
+    if product is None:
+        return jsonify({'error': 'Not Found'}), 404
+    etag = product_etag(id, product.version, variant)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+
+    response = jsonify({name: getattr(product, name) for name in fields})
+    response.set_etag(etag)
+    return response, 200
+
+# GET /products/<id>/reviews - Page through a product's reviews, newest first
+@product_bp.route('/<int:id>/reviews', methods=['GET'])
+def list_reviews(id):
+    limit, cursor = page_args(request.args)
+    if product_cache.get(id) is None:
+        return jsonify({'error': 'Not Found'}), 404
+    try:
+        rows, next_cursor = paginate_keyset(review_select(id), Review, limit, cursor)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'reviews': serialize_reviews(rows), 'next_cursor': next_cursor}), 200
+
+# POST /products/<id>/reviews - Review a product
+@product_bp.route('/<int:id>/reviews', methods=['POST'])
+def create_review(id):
+    data = request.get_json(silent=True) or {}
+    rating = data.get('rating')
+    # type() rather than isinstance: True and 1.0 compare equal to 1 but are not ratings
+    if type(rating) is not int or rating not in RATINGS:
+        return jsonify({'error': 'rating must be an integer from 1 to 5'}), 400
+    comment = data.get('comment')
+    if comment is not None and not isinstance(comment, str):
+        return jsonify({'error': 'comment must be a string'}), 400
+
+    user = User.query.filter_by(email=data.get('email')).first() if data.get('email') else None
+    if not user:
+        return jsonify({'error': 'Invalid email'}), 400
+
+    review = add_review(id, user.id, rating, comment)
+    if review is None:
+        db.session.rollback()
+        return jsonify({'error': 'Not Found'}), 404
+    db.session.commit()
+    ratings_changed([id])
+    return jsonify({'message': 'Review added successfully', 'review_id': review.id}), 201
 
 # POST /products - Create a new product
 @product_bp.route('', methods=['POST'])
@@ -77,8 +124,38 @@ def create_product():
     )
     db.session.add(new_product)
     db.session.commit()
+    products_changed([new_product.id])
     return jsonify({'message': 'Product created successfully', 'product_id': new_product.id}), 201
 
+# POST /products/import - Bulk create products from an NDJSON or CSV upload
+@product_bp.route('/import', methods=['POST'])
+def bulk_import_products():
+    import_format = request.args.get('format')
+    if not import_format:
+        import_format = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+    if import_format not in IMPORT_FORMATS:
+        return jsonify({'error': "format must be 'ndjson' or 'csv'"}), 400
+    default_seller_id = request.args.get('seller_id', type=int)
+
+    try:
+        report = import_products(request.stream, import_format, default_seller_id)
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({'error': 'Upload must be UTF-8 encoded'}), 400
+    return jsonify(report.to_dict()), 200
+
+# PATCH /products/batch - Set price and/or stock on many products at once
+@product_bp.route('/batch', methods=['PATCH'])
+def batch_update_products():
+    data = request.get_json(silent=True) or {}
+    updates = data.get('updates')
+    if not isinstance(updates, list) or not updates:
+        return jsonify({'error': 'updates must be a non-empty list'}), 400
+    if len(updates) > MAX_BATCH_UPDATES:
+        return jsonify({'error': f'At most {MAX_BATCH_UPDATES} updates per request'}), 400
+
+    return jsonify(apply_batch_updates(updates)), 200
+
 # PUT /products/<id> - Update an existing product
 @product_bp.route('/<int:id>', methods=['PUT'])
 def update_product(id):
@@ -93,6 +170,7 @@ def update_product(id):
     product.category_id = data.get('category_id', product.category_id)
 
     db.session.commit()
+    products_changed([id])
     return jsonify({'message': 'Product updated successfully'}), 200
 
 # DELETE /products/<id> - Delete a product
@@ -101,4 +179,5 @@ def delete_product(id):
     product = Product.query.get_or_404(id)
     db.session.delete(product)
     db.session.commit()
+    products_changed([id])
     return jsonify({'message': 'Product deleted successfully'}), 200
@@ -1,3 +1,18 @@
 from .email_verification import generate_verification_token, send_verification_email, verify_verification_token
 from .password_reset import generate_reset_token, verify_reset_token, send_reset_email
 from .validation import is_valid_email, is_valid_password
+from .pagination import InvalidCursor, page_args, paginate_keyset
+from .catalog import parse_fields, product_select, products_by_ids, serialize_products
+from .catalog_snapshot import catalog_snapshot
+from .search import apply_text_search
+from .search_index import search_index, use_search_index
+from .catalog_events import order_completed, products_changed, stock_changed
+from .facets import compute_facets, parse_price_buckets
+from .suggest import suggest_index
+from .response_cache import cached_response, response_cache
+from .best_sellers import best_sellers_query, rebuild_sales_counters, record_completed_order
+from .conditional import not_modified, product_etag, rows_etag
+from .product_cache import product_cache
+from .recommendations import rebuild_product_neighbors, record_order_neighbors
+from .reviews import add_review
+from .post_commit import after_response
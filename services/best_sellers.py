@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+from models import db
+from models.order import Order
+from models.order_item import OrderItem
+from models.product import Product
+from models.product_sales import ProductSales
+from models.product_sales_daily import ProductSalesDaily
+from services.upsert import upsert_insert
+
+
+def _sales_select(*extra_columns):
+    return (
+        db.select(
+            OrderItem.product_id,
+            *extra_columns,
+            db.func.count(OrderItem.id),
+            db.func.coalesce(db.func.sum(OrderItem.quantity), 0),
+        )
+        .join(Order, OrderItem.order_id == Order.id)
+    )
+
+
+def record_completed_order(order_id):
+    """
+    Add a newly completed order's items to the sales counters.
+
+    Call once per order, after its items are written and it is
+    'completed'; the caller commits.
+    """
+    day = db.func.date(Order.created_at)
+
+    totals = _sales_select().where(OrderItem.order_id == order_id).group_by(OrderItem.product_id)
+    statement = upsert_insert(ProductSales).from_select(
+        ["product_id", "order_count", "units_sold"], totals
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[ProductSales.product_id],
+        set_={
+            "order_count": ProductSales.order_count + statement.excluded.order_count,
+            "units_sold": ProductSales.units_sold + statement.excluded.units_sold,
+            "updated_at": datetime.utcnow(),
+        },
+    )
+    db.session.execute(statement)
+
+    daily = _sales_select(day).where(OrderItem.order_id == order_id).group_by(OrderItem.product_id, day)
+    statement = upsert_insert(ProductSalesDaily).from_select(
+        ["product_id", "day", "order_count", "units_sold"], daily
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[ProductSalesDaily.product_id, ProductSalesDaily.day],
+        set_={
+            "order_count": ProductSalesDaily.order_count + statement.excluded.order_count,
+            "units_sold": ProductSalesDaily.units_sold + statement.excluded.units_sold,
+        },
+    )
+    db.session.execute(statement)
+
+
+def rebuild_sales_counters():
+    """Recompute both sales tables from every completed order. The caller commits."""
+    day = db.func.date(Order.created_at)
+    completed = Order.status == 'completed'
+
+    db.session.execute(db.delete(ProductSalesDaily))
+    db.session.execute(db.delete(ProductSales))
+    db.session.execute(
+        db.insert(ProductSales).from_select(
+            ["product_id", "order_count", "units_sold"],
+            _sales_select().where(completed).group_by(OrderItem.product_id),
+        )
+    )
+    db.session.execute(
+        db.insert(ProductSalesDaily).from_select(
+            ["product_id", "day", "order_count", "units_sold"],
+            _sales_select(day).where(completed).group_by(OrderItem.product_id, day),
+        )
+    )
+
+
+def best_sellers_query(window_days=0, query=None):
+    """
+    Products ordered by completed-order count, best first.
+
+    ``query`` is the product query or ``select()`` to rank, Product.query by
+    default. With ``window_days`` only sales from that many recent days
+    count; otherwise the all-time totals are read straight off their index.
+    """
+    if query is None:
+        query = Product.query
+    if not window_days:
+        return (
+            query
+            .join(ProductSales, ProductSales.product_id == Product.id)
+            .filter(ProductSales.order_count > 0)
+            .order_by(ProductSales.order_count.desc(), Product.id)
+        )
+
+    since = datetime.utcnow().date() - timedelta(days=window_days)
+    recent = (
+        db.select(
+            ProductSalesDaily.product_id,
+            db.func.sum(ProductSalesDaily.order_count).label("order_count"),
+        )
+        .where(ProductSalesDaily.day >= since)
+        .group_by(ProductSalesDaily.product_id)
+        .subquery()
+    )
+    return (
+        query
+        .join(recent, recent.c.product_id == Product.id)
+        .order_by(recent.c.order_count.desc(), Product.id)
+    )
@@ -0,0 +1,56 @@
+from models import db
+from models.cart import Cart
+from models.cart_product import CartProduct
+from models.product import Product
+from models.user import User
+from services.upsert import upsert_insert
+
+
+def first_cart_id():
+    """Correlated subquery for the id of the cart belonging to ``User``; the lowest if there are several."""
+    return db.select(db.func.min(Cart.id)).where(Cart.user_id == User.id).correlate(User).scalar_subquery()
+
+
+def user_cart(user_id):
+    """The user's cart, picked as ``first_cart_id`` does (lowest id), or None."""
+    return Cart.query.filter_by(user_id=user_id).order_by(Cart.id).first()
+
+
+def find_cart_owner(email):
+    """Return ``(user_id, cart_id)`` for an email in one query, cart_id None if they have no cart, or None."""
+    return db.session.execute(
+        db.select(User.id.label('user_id'), first_cart_id().label('cart_id')).where(User.email == email)
+    ).first()
+
+
+def create_cart(user_id):
+    """Add an empty cart for a user in the current transaction and return its id."""
+    cart = Cart(user_id=user_id)
+    db.session.add(cart)
+    db.session.flush()
+    return cart.id
+
+
+def add_quantity(cart_id, product_id, quantity):
+    """
+    Add ``quantity`` (> 0) of a product to a cart with a single upsert.
+
+    ``INSERT ... SELECT FROM product ... ON CONFLICT (cart_id, product_id)
+    DO UPDATE`` creates the line or adds to it, and both branches only write
+    while the product has stock for the resulting quantity. Returns the new
+    quantity, or None when nothing was written because the product does not
+    exist or has too little stock. The caller commits.
+    """
+    line = (
+        db.select(db.literal(cart_id), Product.id, db.literal(quantity))
+        .where(Product.id == product_id, Product.stock >= quantity)
+    )
+    statement = upsert_insert(CartProduct).from_select(['cart_id', 'product_id', 'quantity'], line)
+    stock = db.select(Product.stock).where(Product.id == statement.excluded.product_id).scalar_subquery()
+    total = CartProduct.quantity + statement.excluded.quantity
+    statement = statement.on_conflict_do_update(
+        index_elements=[CartProduct.cart_id, CartProduct.product_id],
+        set_={'quantity': total},
+        where=stock >= total,
+    ).returning(CartProduct.quantity)
+    return db.session.execute(statement).scalar()
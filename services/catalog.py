@@ -0,0 +1,154 @@
+from functools import lru_cache
+
+from models import db
+from models.category import Category
+from models.product import Product
+from models.user import User
+from services.serialization import row_serializer
+
+# Most ids bound into one IN list by products_by_ids
+IDS_PER_QUERY = 500
+
+# SQL expression behind every product field a route can return
+PRODUCT_EXPRESSIONS = {
+    "id": Product.id,
+    "name": Product.name,
+    "description": Product.description,
+    "price": Product.price,
+    "stock": Product.stock,
+    "image_url": Product.image_url,
+    "seller_id": Product.seller_id,
+    "category_id": Product.category_id,
+    "created_at": Product.created_at,
+    "uniqueLink": Product.uniqueLink,
+    "category_name": Category.name.label("category_name"),
+    "category": Category.name.label("category"),
+    "seller_name": User.username.label("seller_name"),
+    "average_rating": db.case(
+        (Product.rating_count > 0, db.cast(Product.rating_sum, db.Float) / Product.rating_count),
+        else_=None,
+    ).label("average_rating"),
+    "review_count": Product.rating_count.label("review_count"),
+    # Several columns, combined by PRODUCT_COMBINERS
+    "rating_histogram": tuple(getattr(Product, f"rating_{star}") for star in range(1, 6)),
+}
+
+# Turn the columns of a multi-column field into its value
+PRODUCT_COMBINERS = {
+    "rating_histogram": lambda counts: dict(zip(("1", "2", "3", "4", "5"), counts)),
+}
+
+# Fields that need category or seller joined in
+CATEGORY_FIELDS = frozenset({"category_name", "category"})
+SELLER_FIELDS = frozenset({"seller_name"})
+
+# Columns every product select carries after the requested fields, for
+# keyset pagination and ETags
+_TRAILING_COLUMNS = ("id", "created_at", "version")
+
+# Default payload of each kind of product response
+BASIC_FIELDS = (
+    "id", "name", "description", "price", "stock", "image_url", "seller_id", "category_id", "created_at",
+)
+LISTING_FIELDS = (
+    "id", "name", "description", "price", "stock", "image_url", "seller_id", "category_id",
+    "category_name", "created_at", "uniqueLink",
+)
+SEARCH_FIELDS = (
+    "id", "name", "description", "price", "stock", "image_url", "category_id", "category_name", "created_at",
+)
+DETAIL_FIELDS = (
+    "id", "name", "description", "price", "stock", "image_url", "seller_id", "category_id",
+    "category_name", "created_at", "seller_name", "average_rating", "review_count", "rating_histogram",
+    "uniqueLink",
+)
+
+
+def parse_fields(raw, allowed):
+    """
+    Parse a ``fields=`` parameter such as ``"id,name,price"``.
+
+    Returns ``allowed`` when nothing was asked for. Raises ValueError for
+    names that are not part of the route's payload.
+    """
+    if not raw:
+        return allowed
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise ValueError("Unknown fields: " + ", ".join(sorted(unknown)))
+    return tuple(name for name in allowed if name in requested)
+
+
+def product_select(fields=LISTING_FIELDS):
+    """
+    Core SELECT returning one row tuple per product.
+
+    The row starts with the columns of ``fields`` in order, followed by id,
+    created_at and version under those names so pagination and ETags can
+    read them.
+    Category or seller are outer joined only when a field reads them.
+    """
+    columns = []
+    for name in fields:
+        expression = PRODUCT_EXPRESSIONS[name]
+        columns.extend(expression if isinstance(expression, tuple) else (expression,))
+    columns += [getattr(Product, name).label(name) for name in _TRAILING_COLUMNS]
+    statement = db.select(*columns).select_from(Product)
+    if CATEGORY_FIELDS.intersection(fields):
+        statement = statement.outerjoin(Category, Product.category_id == Category.id)
+    if SELLER_FIELDS.intersection(fields):
+        statement = statement.outerjoin(User, Product.seller_id == User.id)
+    return statement
+
+
+def products_by_ids(product_ids, fields):
+    """
+    Rows of ``product_select(fields)`` for ``product_ids``, in that order.
+
+    Ids with no product are skipped. Ids are read IDS_PER_QUERY at a time
+    so the IN list stays bounded however many are asked for.
+    """
+    if not product_ids:
+        return []
+    statement = product_select(fields)
+    by_id = {}
+    for start in range(0, len(product_ids), IDS_PER_QUERY):
+        chunk = product_ids[start:start + IDS_PER_QUERY]
+        by_id.update((row.id, row) for row in db.session.execute(statement.where(Product.id.in_(chunk))))
+    return [by_id[product_id] for product_id in product_ids if product_id in by_id]
+
+
+@lru_cache(maxsize=64)
+def product_serializer(fields):
+    """
+    Compiled serializer for rows of ``product_select(fields)``, cached per field tuple.
+
+    Values are passed through as read; the app's JSON provider encodes
+    datetimes.
+    """
+    if not PRODUCT_COMBINERS.keys() & set(fields):
+        return row_serializer(fields)
+
+    slices = []
+    position = 0
+    for name in fields:
+        expression = PRODUCT_EXPRESSIONS[name]
+        width = len(expression) if isinstance(expression, tuple) else 1
+        slices.append((name, position, position + width, PRODUCT_COMBINERS.get(name)))
+        position += width
+
+    def serialize(rows):
+        return [
+            {
+                name: combine(row[start:stop]) if combine else row[start]
+                for name, start, stop, combine in slices
+            }
+            for row in rows
+        ]
+    return serialize
+
+
+def serialize_products(rows, fields):
+    """Serialize rows of ``product_select(fields)`` to a list of dicts."""
+    return product_serializer(fields)(rows)
@@ -0,0 +1,39 @@
+from services.catalog_snapshot import catalog_snapshot
+from services.product_cache import product_cache
+from services.response_cache import HOMEPAGE_CACHE_KEY, response_cache
+from services.search_index import search_index
+from services.suggest import suggest_index
+
+
+def products_changed(product_ids):
+    """
+    Bring this worker's in-memory catalog state up to date after a commit.
+
+    Call with the ids of every product that was created, updated or deleted
+    once the transaction has been committed.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return
+    response_cache.invalidate(HOMEPAGE_CACHE_KEY)
+    product_cache.invalidate(product_ids)
+    catalog_snapshot.refresh_products(product_ids)
+    search_index.refresh(product_ids)
+    suggest_index.refresh_products(product_ids)
+
+
+def stock_changed(product_ids):
+    """Drop cached state showing stock levels after an order changed them."""
+    response_cache.invalidate(HOMEPAGE_CACHE_KEY)
+    product_cache.invalidate(product_ids)
+    catalog_snapshot.refresh_products(product_ids)
+
+
+def ratings_changed(product_ids):
+    """Drop cached product rows whose version moved because a review was written."""
+    product_cache.invalidate(product_ids)
+
+
+def order_completed():
+    """Drop cached pages ranking products by sales once an order's counters are committed."""
+    response_cache.invalidate(HOMEPAGE_CACHE_KEY)
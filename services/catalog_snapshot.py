@@ -0,0 +1,211 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from models import db
+from models.product import Product
+from services.pagination import decode_cursor, encode_cursor
+
+# Rows read per round trip while building the snapshot
+BUILD_BATCH_SIZE = 5000
+
+# Changes are re-read this far behind the newest marker seen, so rows
+# committed late with an earlier updated_at are not missed
+MARKER_OVERLAP = timedelta(seconds=5)
+
+# Seconds between full rebuilds, which also drop rows deleted by other workers
+FULL_REBUILD_INTERVAL = 600
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _micros(value):
+    return (value - _EPOCH) // _MICROSECOND if value else 0
+
+
+def _datetime(micros):
+    return _EPOCH + timedelta(microseconds=int(micros))
+
+
+class _Columns:
+    """One immutable set of column arrays, rows sorted by (created_at, id)."""
+
+    __slots__ = ("ids", "category_ids", "prices", "stocks", "created")
+
+    def __init__(self, ids, category_ids, prices, stocks, created):
+        order = np.lexsort((ids, created))
+        self.ids = ids[order]
+        self.category_ids = category_ids[order]
+        self.prices = prices[order]
+        self.stocks = stocks[order]
+        self.created = created[order]
+
+    @classmethod
+    def from_rows(cls, rows):
+        return cls(
+            np.array([row.id for row in rows], dtype=np.int64),
+            np.array([row.category_id if row.category_id is not None else -1 for row in rows], dtype=np.int64),
+            np.array([row.price if row.price is not None else np.nan for row in rows], dtype=np.float64),
+            np.array([row.stock or 0 for row in rows], dtype=np.int64),
+            np.array([_micros(row.created_at) for row in rows], dtype=np.int64),
+        )
+
+    def merged(self, replaced_ids, fresh):
+        """Return new columns without ``replaced_ids`` and with the rows of ``fresh`` added."""
+        keep = ~np.isin(self.ids, replaced_ids)
+        return _Columns(
+            np.concatenate((self.ids[keep], fresh.ids)),
+            np.concatenate((self.category_ids[keep], fresh.category_ids)),
+            np.concatenate((self.prices[keep], fresh.prices)),
+            np.concatenate((self.stocks[keep], fresh.stocks)),
+            np.concatenate((self.created[keep], fresh.created)),
+        )
+
+
+class CatalogSnapshot:
+    """
+    Per-worker columnar copy of the attributes products are filtered on.
+
+    Holds id, category_id, price, stock and created_at as NumPy arrays so
+    category, price range and in-stock filters, the newest-first ordering
+    and keyset pagination run as vectorized masks. Only the ids of the page
+    being returned are then read from the database.
+
+    The snapshot is refreshed incrementally from ``product.updated_at``:
+    once CATALOG_SNAPSHOT_REFRESH seconds have passed, the next request
+    reads only the rows changed since the last marker. Writes made by this
+    worker are applied straight away through ``refresh_products``. Rows
+    deleted by other workers are dropped at the next full rebuild; until
+    then the page read simply skips them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._columns = None
+        self._marker = None
+        self._refreshed_at = 0.0
+        self._built_at = 0.0
+
+    @property
+    def built(self):
+        return self._columns is not None
+
+    def __len__(self):
+        return 0 if self._columns is None else len(self._columns.ids)
+
+    @staticmethod
+    def _select():
+        return db.select(
+            Product.id, Product.category_id, Product.price, Product.stock, Product.created_at, Product.updated_at
+        )
+
+    @staticmethod
+    def _newest(rows, marker):
+        stamps = [row.updated_at for row in rows if row.updated_at is not None]
+        if marker is not None:
+            stamps.append(marker)
+        return max(stamps) if stamps else None
+
+    def build(self):
+        """(Re)load every product from the database."""
+        rows = db.session.execute(self._select().execution_options(yield_per=BUILD_BATCH_SIZE)).all()
+        columns = _Columns.from_rows(rows)
+        marker = self._newest(rows, None)
+        now = time.monotonic()
+        with self._lock:
+            self._columns = columns
+            self._marker = marker
+            self._refreshed_at = self._built_at = now
+
+    def refresh(self):
+        """Apply every product changed since the last marker."""
+        statement = self._select()
+        if self._marker is not None:
+            statement = statement.where(Product.updated_at >= self._marker - MARKER_OVERLAP)
+        rows = db.session.execute(statement).all()
+        with self._lock:
+            if rows:
+                fresh = _Columns.from_rows(rows)
+                self._columns = self._columns.merged(fresh.ids, fresh)
+                self._marker = self._newest(rows, self._marker)
+            self._refreshed_at = time.monotonic()
+
+    def refresh_products(self, product_ids):
+        """Re-read the given products; ids that no longer exist are dropped."""
+        if self._columns is None or not product_ids:
+            return
+        rows = db.session.execute(self._select().where(Product.id.in_(product_ids))).all()
+        replaced = np.array(list(product_ids), dtype=np.int64)
+        with self._lock:
+            self._columns = self._columns.merged(replaced, _Columns.from_rows(rows))
+
+    def ensure_fresh(self, interval):
+        """Build on first use, rebuild after FULL_REBUILD_INTERVAL, else refresh every ``interval`` seconds."""
+        now = time.monotonic()
+        if (
+            self._columns is not None
+            and now - self._built_at <= FULL_REBUILD_INTERVAL
+            and now - self._refreshed_at <= interval
+        ):
+            return
+        # One request does the work; the others keep using the current columns if there are any
+        if not self._build_lock.acquire(blocking=self._columns is None):
+            return
+        try:
+            now = time.monotonic()
+            if self._columns is None or now - self._built_at > FULL_REBUILD_INTERVAL:
+                self.build()
+            elif now - self._refreshed_at > interval:
+                self.refresh()
+        finally:
+            self._build_lock.release()
+
+    def _mask(self, columns, category_id=None, min_price=None, max_price=None, in_stock=False):
+        mask = np.ones(len(columns.ids), dtype=bool)
+        if category_id:
+            mask &= columns.category_ids == category_id
+        if min_price is not None:
+            mask &= columns.prices >= min_price
+        if max_price is not None:
+            mask &= columns.prices <= max_price
+        if in_stock:
+            mask &= columns.stocks > 0
+        return mask
+
+    def page(self, limit, cursor=None, **filters):
+        """
+        Return ``(ids, next_cursor)`` for one newest-first page.
+
+        Takes the same cursors as ``paginate_keyset``; filters are
+        ``category_id``, ``min_price``, ``max_price`` and ``in_stock``.
+        """
+        columns = self._columns
+        mask = self._mask(columns, **filters)
+        if cursor:
+            created_at, row_id = decode_cursor(cursor)
+            created = _micros(created_at)
+            mask &= (columns.created < created) | ((columns.created == created) & (columns.ids < row_id))
+
+        # Rows are stored oldest first, so the page is the tail of the match list
+        positions = np.flatnonzero(mask)[-(limit + 1):][::-1]
+        next_cursor = None
+        if len(positions) > limit:
+            positions = positions[:limit]
+            last = positions[-1]
+            next_cursor = encode_cursor(_datetime(columns.created[last]), int(columns.ids[last]))
+        return columns.ids[positions].tolist(), next_cursor
+
+
+catalog_snapshot = CatalogSnapshot()
+
+
+def use_catalog_snapshot(app):
+    """Return True when filtering should go through ``catalog_snapshot``, bringing it up to date."""
+    if not app.config.get("CATALOG_SNAPSHOT"):
+        return False
+    catalog_snapshot.ensure_fresh(app.config.get("CATALOG_SNAPSHOT_REFRESH", 5))
+    return True
@@ -0,0 +1,94 @@
+from models import db
+from models.cart_product import CartProduct
+from models.order import Order
+from models.order_item import OrderItem
+from models.product import Product
+from models.user import User
+from services.best_sellers import record_completed_order
+from services.catalog_events import order_completed
+from services.recommendations import record_order_neighbors
+
+
+def checkout_lines(cart_id):
+    """
+    Read a cart's lines with the price and stock of each product in one query.
+
+    Product rows are locked in id order (FOR UPDATE where the database
+    supports it), so concurrent checkouts sharing products queue up instead
+    of deadlocking on the stock UPDATE that follows.
+    """
+    return db.session.execute(
+        db.select(
+            CartProduct.product_id, CartProduct.quantity, Product.name, Product.price, Product.stock
+        )
+        .join(Product, Product.id == CartProduct.product_id)
+        .where(CartProduct.cart_id == cart_id)
+        .order_by(Product.id)
+        .with_for_update(of=Product)
+    ).all()
+
+
+def decrement_stock(quantities):
+    """
+    Take ``{product_id: quantity}`` out of stock with one conditional UPDATE.
+
+    A product is only decremented while it still has enough stock, so two
+    checkouts can never both take the last unit. Returns the ids that could
+    not be decremented; when any are returned the caller must roll back.
+    """
+    if not quantities:
+        return []
+    quantity = db.case(quantities, value=Product.id)
+    statement = (
+        db.update(Product)
+        .where(Product.id.in_(quantities), Product.stock >= quantity)
+        .values(stock=Product.stock - quantity)
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    )
+    decremented = set(db.session.execute(statement).scalars())
+    return [product_id for product_id in quantities if product_id not in decremented]
+
+
+def clear_cart(cart_id):
+    """Delete every line of a cart in one statement."""
+    db.session.execute(
+        db.delete(CartProduct).where(CartProduct.cart_id == cart_id).execution_options(synchronize_session=False)
+    )
+
+
+def create_order(user_id, lines, total_price):
+    """
+    Write a completed order and its items for the checked out ``lines``.
+
+    The order is one INSERT and its items one executemany, both in the
+    caller's transaction; the caller commits. Returns the order id.
+    """
+    order = Order(user_id=user_id, total_price=total_price, status='completed')
+    db.session.add(order)
+    db.session.flush()
+    db.session.execute(db.insert(OrderItem), [
+        {
+            'order_id': order.id,
+            'product_id': line.product_id,
+            'quantity': line.quantity,
+            'price_at_purchase': line.price,
+        }
+        for line in lines
+    ])
+    return order.id
+
+
+def award_credits(user_id, credits_earned):
+    """Add purchase credits to a user with a relative UPDATE. The caller commits."""
+    db.session.execute(
+        db.update(User).where(User.id == user_id).values(credits=User.credits + credits_earned)
+    )
+
+
+def record_order(order_id):
+    """Fold a committed order into the sales and bought-together counters, and commit."""
+    record_completed_order(order_id)
+    record_order_neighbors(order_id)
+    db.session.commit()
+    order_completed()
@@ -0,0 +1,88 @@
+import gzip
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Response types worth compressing; everything else is sent as is
+COMPRESSIBLE_MIMETYPES = frozenset({
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/css",
+    "text/html",
+    "text/plain",
+})
+
+
+def negotiate_encoding():
+    """Pick "br", "gzip" or None from the request's Accept-Encoding."""
+    accepted = request.accept_encodings
+    gzip_quality = accepted["gzip"]
+    if brotli is not None and accepted["br"] and accepted["br"] >= gzip_quality:
+        return "br"
+    if gzip_quality:
+        return "gzip"
+    return None
+
+
+def compress(data, encoding, level):
+    """Compress ``data`` with ``encoding`` at ``level`` (1-9)."""
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    # A fixed mtime keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _is_candidate(response):
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if "Content-Encoding" in response.headers:
+        return False
+    return response.mimetype in COMPRESSIBLE_MIMETYPES
+
+
+def compress_response(response, variants=None):
+    """
+    Compress ``response`` in place for the current request, if it is worth it.
+
+    Bodies smaller than COMPRESSION_MIN_SIZE are left alone. ``variants``
+    is an optional dict of already compressed bodies keyed by encoding for
+    this exact payload; it is read first and filled on a miss, so a cached
+    response is compressed once per encoding instead of once per request.
+    """
+    if not _is_candidate(response):
+        return response
+    body = response.get_data()
+    if len(body) < current_app.config.get("COMPRESSION_MIN_SIZE", 0):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    compressed = variants.get(encoding) if variants is not None else None
+    if compressed is None:
+        compressed = compress(body, encoding, current_app.config.get("COMPRESSION_LEVEL", 6))
+        if variants is not None:
+            variants[encoding] = compressed
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    # The compressed bytes differ from the identity body, so a strong
+    # validator would be wrong for them
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """Compress every eligible response according to Accept-Encoding."""
+    app.after_request(compress_response)
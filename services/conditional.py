@@ -0,0 +1,44 @@
+import zlib
+
+from flask import current_app, request
+
+
+def _crc(values):
+    return "%08x" % zlib.crc32(repr(tuple(values)).encode("utf-8"))
+
+
+def product_etag(product_id, version, fields=None, related=None):
+    """
+    Entity tag for one product row at a given version.
+
+    Pass ``fields`` when the client asked for a sparse fieldset so each
+    representation gets its own tag. Pass ``related`` with the versions or
+    values of joined rows the representation shows, such as the category
+    version and seller name, so changing those changes the tag too.
+    """
+    etag = f"product-{product_id}-v{version}"
+    if fields:
+        etag += "-f%08x" % zlib.crc32(",".join(fields).encode("utf-8"))
+    if related:
+        etag += "-r" + _crc(related)
+    return etag
+
+
+def rows_etag(prefix, rows):
+    """Entity tag over a small set of rows, from their (id, version, created_at) tuples."""
+    rows = list(rows)
+    return f"{prefix}-{len(rows)}-{_crc(tuple(row) for row in rows)}"
+
+
+def not_modified(etag):
+    """
+    Return a 304 response when the client already holds ``etag``, else None.
+
+    Checked before the resource is loaded or serialized, so a cache hit costs
+    only the version lookup.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    return None
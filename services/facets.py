@@ -0,0 +1,51 @@
+from bisect import bisect_right
+
+# Upper edges of the default price histogram buckets
+DEFAULT_PRICE_BUCKETS = (25, 50, 100, 250, 500, 1000)
+
+# Most edges a client may ask for in price_buckets
+MAX_PRICE_BUCKETS = 20
+
+
+def parse_price_buckets(raw):
+    """
+    Parse a comma separated list of bucket edges, e.g. ``"10,50,100"``.
+
+    Returns the default edges when ``raw`` is empty. Raises ValueError for
+    anything that isn't a short list of numbers.
+    """
+    if not raw:
+        return DEFAULT_PRICE_BUCKETS
+    edges = sorted({float(edge) for edge in raw.split(",") if edge.strip()})
+    if not edges or len(edges) > MAX_PRICE_BUCKETS:
+        raise ValueError("price_buckets must list between 1 and %d prices" % MAX_PRICE_BUCKETS)
+    return tuple(edges)
+
+
+def compute_facets(rows, edges=DEFAULT_PRICE_BUCKETS):
+    """
+    Count matches per category and per price bucket in a single pass.
+
+    ``rows`` yields ``(category_id, category_name, price)`` for every matched
+    product. With edges ``(25, 50)`` the buckets are ``< 25``, ``25 - 50``
+    and ``>= 50``; empty buckets are included so the list is stable.
+    """
+    categories = {}
+    price_counts = [0] * (len(edges) + 1)
+
+    for category_id, category_name, price in rows:
+        entry = categories.get(category_id)
+        if entry is None:
+            entry = categories[category_id] = {"id": category_id, "name": category_name, "count": 0}
+        entry["count"] += 1
+        if price is not None:
+            price_counts[bisect_right(edges, price)] += 1
+
+    bounds = (None,) + tuple(edges) + (None,)
+    return {
+        "categories": sorted(categories.values(), key=lambda entry: (-entry["count"], entry["id"] or 0)),
+        "price": [
+            {"min": bounds[i], "max": bounds[i + 1], "count": count}
+            for i, count in enumerate(price_counts)
+        ],
+    }
@@ -0,0 +1,79 @@
+import json
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Values accepted by the JSON_PROVIDER setting
+JSON_PROVIDERS = ("auto", "orjson", "stdlib")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes with orjson when it is installed.
+
+    Dates and times are written as ISO 8601 strings by both encoders, so
+    serializers can hand over raw column values instead of calling
+    ``isoformat()`` per row. Without orjson, or when indented output is
+    asked for, it falls back to the stdlib encoder.
+    """
+
+    def __init__(self, app, use_orjson=True):
+        super().__init__(app)
+        self.use_orjson = use_orjson and orjson is not None
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (datetime, date, time)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+    def _orjson_options(self, sort_keys):
+        options = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        # orjson output is always compact, so only indentation needs stdlib
+        if self.use_orjson and not kwargs.get("indent"):
+            options = self._orjson_options(kwargs.get("sort_keys", self.sort_keys))
+            return orjson.dumps(obj, default=self.default, option=options).decode("utf-8")
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        if not self.use_orjson or indent:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(
+            obj, default=self.default, option=self._orjson_options(self.sort_keys) | orjson.OPT_APPEND_NEWLINE
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """
+    Install ``FastJSONProvider`` as ``app.json`` per the JSON_PROVIDER setting.
+
+    "auto" uses orjson when it can be imported, "stdlib" never does, and
+    "orjson" requires it.
+    """
+    choice = app.config.get("JSON_PROVIDER", "auto")
+    if choice not in JSON_PROVIDERS:
+        raise ValueError(f"JSON_PROVIDER must be one of {', '.join(JSON_PROVIDERS)}")
+    if choice == "orjson" and orjson is None:
+        raise RuntimeError("JSON_PROVIDER is 'orjson' but orjson is not installed")
+    app.json = FastJSONProvider(app, use_orjson=choice != "stdlib")
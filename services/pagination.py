@@ -0,0 +1,64 @@
+import base64
+import json
+from datetime import datetime
+
+from models import db
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that we did not issue."""
+
+
+def encode_cursor(created_at, row_id):
+    """Encode a (created_at, id) position as an opaque URL-safe token."""
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Decode a token produced by ``encode_cursor`` back into (created_at, id)."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def page_args(args):
+    """Read ``limit`` and ``cursor`` from request args, clamping the limit."""
+    limit = args.get("limit", DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, MAX_LIMIT))
+    return limit, args.get("cursor") or None
+
+
+def paginate_keyset(query, model, limit=DEFAULT_LIMIT, cursor=None):
+    """
+    Return one page of ``query`` ordered newest first, plus the next cursor.
+
+    ``query`` is either a legacy ORM query or a ``select()`` whose rows carry
+    ``created_at`` and ``id``; ``model.created_at`` must be NOT NULL, since
+    a NULL key would drop out of every tuple comparison. Pages are keyed on
+    (created_at, id) so each page is an index range scan regardless of how
+    deep the client has paged. ``next_cursor`` is None on the last page.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(
+            db.tuple_(model.created_at, model.id) < db.tuple_(created_at, row_id)
+        )
+
+    query = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    if isinstance(query, db.Select):
+        rows = db.session.execute(query).all()
+    else:
+        rows = query.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
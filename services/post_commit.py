@@ -0,0 +1,35 @@
+import logging
+
+from flask import after_this_request, current_app
+
+from models import db
+
+
+def after_response(func, *args):
+    """
+    Run ``func(*args)`` once the current response has been sent.
+
+    For work a request causes but need not wait for, such as counters and
+    rewards. Register tasks only after the request's own transaction has
+    committed. Each call hooks the current request's response, so tasks
+    never leak into a later request sharing the app context. Tasks run in
+    the order registered, each in its own transaction committed when it
+    returns; one that raises is logged and rolled back without stopping the
+    rest.
+    """
+    app = current_app._get_current_object()
+
+    @after_this_request
+    def schedule(response):
+        response.call_on_close(lambda: _run(app, func, args))
+        return response
+
+
+def _run(app, func, args):
+    with app.app_context():
+        try:
+            func(*args)
+            db.session.commit()
+        except Exception:
+            logging.getLogger(__name__).exception("Deferred task %s failed", func.__name__)
+            db.session.rollback()
@@ -0,0 +1,102 @@
+from models import db
+from models.product import Product
+from services.catalog_events import products_changed
+
+# Changes applied per UPDATE statement and transaction
+BATCH_CHUNK_SIZE = 500
+
+# Most changes accepted in one request
+MAX_BATCH_UPDATES = 10000
+
+# Columns a batch update may set
+BATCH_FIELDS = ("price", "stock")
+
+
+def _validate_change(change, seen):
+    if not isinstance(change, dict):
+        return "Each update must be an object"
+    product_id = change.get("id")
+    if not isinstance(product_id, int) or isinstance(product_id, bool):
+        return "id must be an integer"
+    if product_id in seen:
+        return "Duplicate id"
+    if not any(name in change for name in BATCH_FIELDS):
+        return "Nothing to update; give price and/or stock"
+    price = change.get("price")
+    if "price" in change and (
+        not isinstance(price, (int, float)) or isinstance(price, bool) or price < 0
+    ):
+        return "price must be a non-negative number"
+    stock = change.get("stock")
+    if "stock" in change and (not isinstance(stock, int) or isinstance(stock, bool) or stock < 0):
+        return "stock must be a non-negative integer"
+    version = change.get("version")
+    if version is not None and (not isinstance(version, int) or isinstance(version, bool)):
+        return "version must be an integer"
+    return None
+
+
+def _apply_chunk(changes, result):
+    """Apply one chunk of validated changes with a single UPDATE and commit it."""
+    values = {}
+    for name in BATCH_FIELDS:
+        mapping = {change["id"]: change[name] for change in changes if name in change}
+        if mapping:
+            column = getattr(Product, name)
+            values[name] = db.case(mapping, value=Product.id, else_=column)
+
+    unversioned = [change["id"] for change in changes if change.get("version") is None]
+    versioned = [(change["id"], change["version"]) for change in changes if change.get("version") is not None]
+    conditions = []
+    if unversioned:
+        conditions.append(Product.id.in_(unversioned))
+    if versioned:
+        conditions.append(db.tuple_(Product.id, Product.version).in_(versioned))
+
+    statement = (
+        db.update(Product)
+        .where(db.or_(*conditions))
+        .values(values)
+        .returning(Product.id, Product.version)
+        .execution_options(synchronize_session=False)
+    )
+    updated = dict(db.session.execute(statement).all())
+
+    missed = [change["id"] for change in changes if change["id"] not in updated]
+    existing = set()
+    if missed:
+        existing = set(db.session.execute(db.select(Product.id).where(Product.id.in_(missed))).scalars())
+    db.session.commit()
+
+    result["updated"].update(updated)
+    for product_id in missed:
+        result["conflict" if product_id in existing else "not_found"].append(product_id)
+    products_changed(updated)
+
+
+def apply_batch_updates(changes):
+    """
+    Set price and/or stock on many products with optimistic version checks.
+
+    Each change is ``{"id", "price"?, "stock"?, "version"?}``. When
+    ``version`` is given the row is only written if it is still at that
+    version. Changes are applied BATCH_CHUNK_SIZE at a time, one set-based
+    UPDATE and transaction per chunk. Returns::
+
+        {"updated": {id: new_version}, "conflict": [id, ...],
+         "not_found": [id, ...], "invalid": [{"index": i, "error": "..."}]}
+    """
+    result = {"updated": {}, "conflict": [], "not_found": [], "invalid": []}
+    seen = set()
+    valid = []
+    for index, change in enumerate(changes):
+        error = _validate_change(change, seen)
+        if error:
+            result["invalid"].append({"index": index, "error": error})
+            continue
+        seen.add(change["id"])
+        valid.append(change)
+
+    for start in range(0, len(valid), BATCH_CHUNK_SIZE):
+        _apply_chunk(valid[start:start + BATCH_CHUNK_SIZE], result)
+    return result
@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import current_app
+
+from models import db
+from models.product import Product
+
+# Columns kept for each cached product
+SNAPSHOT_FIELDS = (
+    "id", "name", "description", "price", "stock", "image_url", "seller_id", "category_id",
+    "created_at", "version",
+)
+
+ProductSnapshot = namedtuple("ProductSnapshot", SNAPSHOT_FIELDS)
+
+
+class ProductCache:
+    """
+    Per-worker read-through cache of product rows keyed by id.
+
+    Entries are immutable ``ProductSnapshot`` tuples rather than ORM
+    instances, so they can be shared across requests and sessions. The
+    least recently used entries are dropped beyond PRODUCT_CACHE_SIZE and
+    every entry expires after PRODUCT_CACHE_TTL seconds. Writes made by this
+    worker invalidate their entries straight away; the TTL bounds staleness
+    for writes made by other workers. Use it for display reads such as names
+    and prices, never for the stock check that guards a write.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # product_id -> (expires_at, snapshot)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, product_id):
+        """Return the snapshot for ``product_id``, or None if there is no such product."""
+        return self.get_many([product_id]).get(product_id)
+
+    def get_many(self, product_ids):
+        """
+        Return ``{product_id: snapshot}`` for the ids that exist.
+
+        Cached entries are served from memory and all misses are read in a
+        single ``IN`` query.
+        """
+        now = time.monotonic()
+        found = {}
+        misses = []
+        with self._lock:
+            for product_id in dict.fromkeys(product_ids):
+                entry = self._entries.get(product_id)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(product_id)
+                    found[product_id] = entry[1]
+                else:
+                    misses.append(product_id)
+
+        if misses:
+            rows = db.session.execute(
+                db.select(*(getattr(Product, name) for name in SNAPSHOT_FIELDS)).where(Product.id.in_(misses))
+            )
+            loaded = {row.id: ProductSnapshot._make(row) for row in rows}
+            found.update(loaded)
+            self._store(loaded)
+        return found
+
+    def _store(self, snapshots):
+        config = current_app.config
+        ttl = config.get("PRODUCT_CACHE_TTL", 0)
+        if ttl <= 0 or not snapshots:
+            return
+        expires_at = time.monotonic() + ttl
+        max_size = config.get("PRODUCT_CACHE_SIZE", 0)
+        with self._lock:
+            for product_id, snapshot in snapshots.items():
+                self._entries[product_id] = (expires_at, snapshot)
+                self._entries.move_to_end(product_id)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, product_ids):
+        with self._lock:
+            for product_id in product_ids:
+                self._entries.pop(product_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+product_cache = ProductCache()
@@ -0,0 +1,211 @@
+import csv
+import io
+import json
+import math
+from datetime import datetime
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import db
+from models.category import Category
+from models.product import Product
+from models.user import User
+from services.catalog_events import products_changed
+
+# Rows inserted and committed per transaction
+IMPORT_CHUNK_SIZE = 1000
+
+# Row errors listed in the report; later ones are only counted
+MAX_REPORTED_ERRORS = 100
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+# Largest value an Integer column holds on Postgres
+MAX_INTEGER = 2 ** 31 - 1
+
+
+class ImportRowError(ValueError):
+    """A single import row that cannot be inserted."""
+
+
+def iter_records(stream, import_format):
+    """
+    Yield ``(row_number, record)`` from an NDJSON or CSV byte stream.
+
+    Rows are decoded one at a time so the upload is never held in memory.
+    A record that cannot be parsed is yielded as an ImportRowError. CSV is
+    read in strict mode, so a stray quote is reported instead of swallowing
+    the rest of the file into one field.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    if import_format == "csv":
+        reader = csv.DictReader(text, strict=True)
+        row_number = 0
+        while True:
+            row_number += 1
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                record = ImportRowError(f"Malformed CSV: {e}")
+            yield row_number, record
+
+    for row_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield row_number, ImportRowError("Invalid JSON")
+            continue
+        if not isinstance(record, dict):
+            record = ImportRowError("Each line must be a JSON object")
+        yield row_number, record
+
+
+def _number(record, name, kind, required=True, default=None):
+    value = record.get(name)
+    if value is None or value == "":
+        if required:
+            raise ImportRowError(f"Missing required field: {name}")
+        return default
+    if isinstance(value, bool):
+        raise ImportRowError(f"{name} must be a number")
+    try:
+        number = kind(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ImportRowError(f"{name} must be a number")
+    if kind is int and not isinstance(value, str) and number != value:
+        raise ImportRowError(f"{name} must be a whole number")
+    if kind is float and not math.isfinite(number):
+        raise ImportRowError(f"{name} must be a finite number")
+    if kind is int and number > MAX_INTEGER:
+        raise ImportRowError(f"{name} must be at most {MAX_INTEGER}")
+    if number < 0:
+        raise ImportRowError(f"{name} must not be negative")
+    return number
+
+
+def _text(record, name, max_length=None, required=True):
+    value = record.get(name)
+    if value is not None and not isinstance(value, str):
+        raise ImportRowError(f"{name} must be a string")
+    value = (value or "").strip()
+    if not value:
+        if required:
+            raise ImportRowError(f"Missing required field: {name}")
+        return None
+    if max_length and len(value) > max_length:
+        raise ImportRowError(f"{name} must be at most {max_length} characters")
+    # csv only rejects NUL before Python 3.11; Postgres text columns never take it
+    if "\x00" in value:
+        raise ImportRowError(f"{name} must not contain NUL bytes")
+    return value
+
+
+def validate_record(record, default_seller_id=None):
+    """
+    Turn one parsed record into column values for an INSERT.
+
+    Applies the same required fields as ``POST /api/products``. Raises
+    ImportRowError describing the first problem found.
+    """
+    return {
+        "name": _text(record, "name", 200),
+        "description": _text(record, "description"),
+        "price": _number(record, "price", float),
+        "stock": _number(record, "stock", int, required=False, default=0),
+        "image_url": _text(record, "image_url", 255, required=False),
+        "seller_id": _number(
+            record, "seller_id", int, required=default_seller_id is None, default=default_seller_id
+        ),
+        "category_id": _number(record, "category_id", int),
+    }
+
+
+class ImportReport:
+    """Running totals and the first MAX_REPORTED_ERRORS row errors of an import."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, row_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "error": message})
+
+    def to_dict(self):
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _flush(chunk, category_ids, report):
+    """Insert one chunk of validated rows and commit it."""
+    seller_ids = {values["seller_id"] for _, values in chunk}
+    known_sellers = set(db.session.execute(db.select(User.id).where(User.id.in_(seller_ids))).scalars())
+
+    rows = []
+    for row_number, values in chunk:
+        if values["category_id"] not in category_ids:
+            report.error(row_number, f"Unknown category_id: {values['category_id']}")
+        elif values["seller_id"] not in known_sellers:
+            report.error(row_number, f"Unknown seller_id: {values['seller_id']}")
+        else:
+            rows.append((row_number, values))
+    if not rows:
+        return
+
+    try:
+        # One executemany; the dialect batches the rows into multi-row INSERTs
+        product_ids = list(db.session.execute(
+            db.insert(Product).returning(Product.id), [values for _, values in rows]
+        ).scalars())
+        db.session.commit()
+    except SQLAlchemyError as e:
+        # The chunk is one transaction, so none of its rows landed
+        db.session.rollback()
+        message = str(getattr(e, "orig", None) or e).splitlines()[0]
+        for row_number, _ in rows:
+            report.error(row_number, f"Insert failed for this chunk: {message}")
+        return
+    report.inserted += len(product_ids)
+    products_changed(product_ids)
+
+
+def import_products(stream, import_format, default_seller_id=None):
+    """
+    Insert every valid product row from an NDJSON or CSV stream.
+
+    Rows are validated as they are read and inserted IMPORT_CHUNK_SIZE at a
+    time, each chunk in its own transaction, so memory stays flat and a bad
+    row only costs itself. Returns an ImportReport.
+    """
+    category_ids = set(db.session.execute(db.select(Category.id)).scalars())
+    report = ImportReport()
+    chunk = []
+    now = datetime.utcnow()
+
+    for row_number, record in iter_records(stream, import_format):
+        try:
+            if isinstance(record, ImportRowError):
+                raise record
+            values = validate_record(record, default_seller_id)
+        except ImportRowError as e:
+            report.error(row_number, str(e))
+            continue
+        values["created_at"] = now
+        chunk.append((row_number, values))
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            _flush(chunk, category_ids, report)
+            chunk = []
+
+    if chunk:
+        _flush(chunk, category_ids, report)
+    return report
@@ -0,0 +1,100 @@
+from models import db
+from models.order import Order
+from models.order_item import OrderItem
+from models.product import Product
+from models.product_neighbor import ProductNeighbor
+from services.upsert import upsert_insert
+
+# Neighbours kept per product. More than any page shows, so an incremental
+# update rarely evicts a pair that would have climbed back into the top.
+NEIGHBORS_KEPT = 50
+
+
+def _pair_counts(*conditions):
+    """(product_id, neighbor_id, orders containing both) over order_item joined to itself."""
+    other = db.aliased(OrderItem)
+    return (
+        db.select(
+            OrderItem.product_id,
+            other.product_id,
+            db.func.count(db.distinct(OrderItem.order_id)),
+        )
+        .join(other, db.and_(other.order_id == OrderItem.order_id, other.product_id != OrderItem.product_id))
+        .where(*conditions)
+        .group_by(OrderItem.product_id, other.product_id)
+    )
+
+
+def _ranked(*conditions):
+    """Every stored pair with its rank among the product's neighbours, best first."""
+    rank = db.func.row_number().over(
+        partition_by=ProductNeighbor.product_id,
+        order_by=(ProductNeighbor.co_count.desc(), ProductNeighbor.neighbor_id),
+    )
+    return (
+        db.select(ProductNeighbor.product_id, ProductNeighbor.neighbor_id, rank.label("rank"))
+        .where(*conditions)
+        .subquery()
+    )
+
+
+def _prune(*conditions):
+    """Delete every pair ranked below NEIGHBORS_KEPT for the products matching ``conditions``."""
+    ranked = _ranked(*conditions)
+    db.session.execute(
+        db.delete(ProductNeighbor)
+        .where(
+            db.tuple_(ProductNeighbor.product_id, ProductNeighbor.neighbor_id).in_(
+                db.select(ranked.c.product_id, ranked.c.neighbor_id).where(ranked.c.rank > NEIGHBORS_KEPT)
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def rebuild_product_neighbors():
+    """
+    Recompute the neighbours table from every completed order. The caller commits.
+
+    The co-occurrence counts come from one grouped self-join of order_item
+    inside the database, and each product is then cut to its top
+    NEIGHBORS_KEPT.
+    """
+    completed = db.select(Order.id).where(Order.status == 'completed')
+    db.session.execute(db.delete(ProductNeighbor))
+    db.session.execute(
+        db.insert(ProductNeighbor).from_select(
+            ["product_id", "neighbor_id", "co_count"],
+            _pair_counts(OrderItem.order_id.in_(completed)),
+        )
+    )
+    _prune()
+
+
+def record_order_neighbors(order_id):
+    """
+    Count a newly completed order's product pairs into the neighbours table.
+
+    Call once per order, after it is completed; the caller commits. Only
+    the order's own products are re-ranked and pruned. A pair that was
+    pruned earlier starts again from this order, so counts can drift low
+    until the next ``flask rebuild-product-neighbors``.
+    """
+    pairs = _pair_counts(OrderItem.order_id == order_id)
+    statement = upsert_insert(ProductNeighbor).from_select(["product_id", "neighbor_id", "co_count"], pairs)
+    statement = statement.on_conflict_do_update(
+        index_elements=[ProductNeighbor.product_id, ProductNeighbor.neighbor_id],
+        set_={"co_count": ProductNeighbor.co_count + statement.excluded.co_count},
+    )
+    db.session.execute(statement)
+    _prune(ProductNeighbor.product_id.in_(db.select(OrderItem.product_id).where(OrderItem.order_id == order_id)))
+
+
+def related_products_query(product_id, query):
+    """Restrict a product ``select()`` to the neighbours of ``product_id``, most bought together first."""
+    return (
+        query
+        .join(ProductNeighbor, ProductNeighbor.neighbor_id == Product.id)
+        .where(ProductNeighbor.product_id == product_id)
+        .order_by(ProductNeighbor.co_count.desc(), ProductNeighbor.neighbor_id)
+    )
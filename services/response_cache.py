@@ -0,0 +1,94 @@
+import functools
+import threading
+import time
+
+from flask import current_app, make_response
+
+from services.compression import compress_response
+
+# Cache key of the /api/home/latest payload
+HOMEPAGE_CACHE_KEY = "homepage"
+
+
+class CachedResponse:
+    """
+    A rendered response body kept until ``expires_at``.
+
+    ``encoded`` holds the body compressed per content encoding, filled the
+    first time a client asks for each.
+    """
+
+    __slots__ = ("body", "status", "mimetype", "expires_at", "encoded")
+
+    def __init__(self, body, status, mimetype, expires_at):
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+        self.expires_at = expires_at
+        self.encoded = {}
+
+
+class ResponseCache:
+    """
+    Per-worker cache of whole GET responses keyed by name.
+
+    Entries expire after their TTL and are dropped early by ``invalidate``
+    when the data behind them is written. Invalidation only reaches the
+    worker that handled the write; the TTL bounds staleness in the others.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            return None
+        return entry
+
+    def set(self, key, response, ttl):
+        entry = CachedResponse(
+            response.get_data(), response.status_code, response.mimetype, time.monotonic() + ttl
+        )
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(key, ttl_setting):
+    """
+    Serve a view from ``response_cache`` for ``app.config[ttl_setting]`` seconds.
+
+    Only 200 responses are stored. A TTL of 0 turns caching off. Hits are
+    compressed from the entry's stored variants rather than recompressed.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            ttl = current_app.config.get(ttl_setting, 0)
+            if ttl <= 0:
+                return view(*args, **kwargs)
+
+            entry = response_cache.get(key)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                entry = response_cache.set(key, response, ttl)
+            response = current_app.response_class(entry.body, status=entry.status, mimetype=entry.mimetype)
+            return compress_response(response, entry.encoded)
+        return wrapper
+    return decorator
@@ -0,0 +1,59 @@
+from models import db
+from models.product import Product
+from models.review import Review
+from models.user import User
+from services.serialization import row_serializer
+
+# Stars a review may give
+RATINGS = (1, 2, 3, 4, 5)
+
+# Columns of one review in a listing, in the order they are serialized
+REVIEW_COLUMNS = (
+    Review.id,
+    Review.product_id,
+    Review.user_id,
+    User.username.label("username"),
+    Review.rating,
+    Review.comment,
+    Review.created_at,
+)
+serialize_reviews = row_serializer(column.key for column in REVIEW_COLUMNS)
+
+
+def add_review(product_id, user_id, rating, comment=None):
+    """
+    Write a review and fold it into the product's rating aggregates.
+
+    The aggregates are bumped with a single relative UPDATE, so concurrent
+    reviews cannot lose each other's counts. Returns the new Review, or None
+    when the product does not exist. Raises ValueError for a rating that is
+    not an int in RATINGS. The caller commits.
+    """
+    if type(rating) is not int or rating not in RATINGS:
+        raise ValueError(f"rating must be an integer from 1 to 5, not {rating!r}")
+    star = getattr(Product, f"rating_{rating}")
+    updated = db.session.execute(
+        db.update(Product)
+        .where(Product.id == product_id)
+        .values({
+            Product.rating_count: Product.rating_count + 1,
+            Product.rating_sum: Product.rating_sum + rating,
+            star: star + 1,
+        })
+        .execution_options(synchronize_session=False)
+    )
+    if updated.rowcount == 0:
+        return None
+    review = Review(product_id=product_id, user_id=user_id, rating=rating, comment=comment)
+    db.session.add(review)
+    db.session.flush()
+    return review
+
+
+def review_select(product_id):
+    """Core SELECT of a product's reviews with the reviewer's name, for ``paginate_keyset``."""
+    return (
+        db.select(*REVIEW_COLUMNS)
+        .outerjoin(User, Review.user_id == User.id)
+        .where(Review.product_id == product_id)
+    )
@@ -0,0 +1,87 @@
+import re
+
+from models import db
+from models.product import Product
+
+# Text search configuration used by the Postgres GIN index. The document
+# expression below must stay identical to the one in the migration that
+# creates ix_product_search, otherwise the planner will not use the index.
+TS_CONFIG = "english"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Cache of whether the SQLite FTS5 table exists, keyed by engine URL
+_fts_tables = {}
+
+
+def tokenize(text):
+    """Split free text into lowercase word tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _search_document():
+    return db.func.to_tsvector(
+        db.literal_column(f"'{TS_CONFIG}'"),
+        db.func.coalesce(Product.name, db.literal_column("''"))
+        .op("||")(db.literal_column("' '"))
+        .op("||")(db.func.coalesce(Product.description, db.literal_column("''"))),
+    )
+
+
+def _has_fts_table(engine):
+    key = str(engine.url)
+    if key not in _fts_tables:
+        _fts_tables[key] = db.inspect(engine).has_table("product_fts")
+    return _fts_tables[key]
+
+
+def apply_text_search(query, text, match_all=True):
+    """
+    Restrict a Product query to rows matching ``text``.
+
+    With ``match_all`` every token must match, otherwise any of them may.
+    The last token also matches as a prefix so results track the search box
+    as the user types. Returns the filtered query and an ORDER BY clause that
+    sorts the most relevant rows first.
+
+    Postgres uses the GIN-indexed tsvector, SQLite the product_fts FTS5
+    table. Other databases, or a SQLite file that was never migrated, fall
+    back to an unranked ILIKE scan.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return query.filter(db.false()), Product.id
+
+    engine = db.engine
+    dialect = engine.dialect.name
+
+    if dialect == "postgresql":
+        terms = [f"{token}:*" if i == len(tokens) - 1 else token for i, token in enumerate(tokens)]
+        operator = " & " if match_all else " | "
+        ts_query = db.func.to_tsquery(db.literal_column(f"'{TS_CONFIG}'"), operator.join(terms))
+        document = _search_document()
+        query = query.filter(document.op("@@")(ts_query))
+        return query, db.func.ts_rank_cd(document, ts_query).desc()
+
+    if dialect == "sqlite" and _has_fts_table(engine):
+        operator = " " if match_all else " OR "
+        match = operator.join(f'"{token}"' for token in tokens) + "*"
+        matches = (
+            db.text(
+                "SELECT rowid AS product_id, bm25(product_fts) AS rank "
+                "FROM product_fts WHERE product_fts MATCH :match"
+            )
+            .bindparams(match=match)
+            .columns(product_id=db.Integer, rank=db.Float)
+            .subquery("fts_matches")
+        )
+        query = query.join(matches, matches.c.product_id == Product.id)
+        # bm25() scores are negative; the best match is the most negative
+        return query, matches.c.rank.asc()
+
+    conditions = [
+        db.or_(Product.name.ilike(f"%{token}%"), Product.description.ilike(f"%{token}%"))
+        for token in tokens
+    ]
+    query = query.filter(db.and_(*conditions) if match_all else db.or_(*conditions))
+    return query, Product.id
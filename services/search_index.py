@@ -0,0 +1,250 @@
+import bisect
+import math
+import threading
+import time
+from collections import Counter
+
+from models import db
+from models.product import Product
+from services.catalog_snapshot import MARKER_OVERLAP
+from services.search import tokenize
+
+# Matches in the product name count this many times towards term frequency
+NAME_BOOST = 2
+
+# Rows read per round trip while building the index
+BUILD_BATCH_SIZE = 1000
+
+# Seconds between full rebuilds, which also drop rows deleted by other workers
+REBUILD_INTERVAL = 600
+
+
+class ProductSearchIndex:
+    """
+    In-memory inverted index over product names and descriptions.
+
+    Each worker holds its own copy, built from the product table on the
+    first search. Writes made by this worker are applied straight away
+    through ``refresh``; changes made elsewhere are picked up from
+    ``product.updated_at`` every SEARCH_INDEX_REFRESH seconds, and the index
+    is rebuilt every REBUILD_INTERVAL seconds so deleted rows drop out.
+    Searches are answered without touching the database. Category and price
+    are stored alongside each document so the usual search filters can be
+    applied before ranking.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._postings = {}      # token -> {product_id: term frequency}
+        self._vocabulary = []    # sorted tokens, for prefix expansion
+        self._doc_terms = {}     # product_id -> distinct tokens in the document
+        self._doc_lengths = {}   # product_id -> number of tokens
+        self._doc_attrs = {}     # product_id -> (category_id, price)
+        self._total_length = 0
+        self._marker = None      # newest product.updated_at applied
+        self._built_at = 0.0
+        self._refreshed_at = 0.0
+        self.built = False
+
+    def __len__(self):
+        return len(self._doc_lengths)
+
+    @staticmethod
+    def _select():
+        return db.select(
+            Product.id, Product.name, Product.description, Product.category_id, Product.price,
+            Product.updated_at,
+        )
+
+    @staticmethod
+    def _newest(rows, marker):
+        stamps = [row.updated_at for row in rows if row.updated_at is not None]
+        if marker is not None:
+            stamps.append(marker)
+        return max(stamps) if stamps else None
+
+    def build(self):
+        """(Re)build the whole index from the product table."""
+        # Build into a fresh index so searches keep running on this one meanwhile
+        fresh = ProductSearchIndex(self.k1, self.b)
+        marker = None
+        for row in db.session.execute(self._select().execution_options(yield_per=BUILD_BATCH_SIZE)):
+            fresh._add(row)
+            if row.updated_at is not None and (marker is None or row.updated_at > marker):
+                marker = row.updated_at
+        fresh._vocabulary = sorted(fresh._postings)
+
+        now = time.monotonic()
+        with self._lock:
+            self._postings = fresh._postings
+            self._vocabulary = fresh._vocabulary
+            self._doc_terms = fresh._doc_terms
+            self._doc_lengths = fresh._doc_lengths
+            self._doc_attrs = fresh._doc_attrs
+            self._total_length = fresh._total_length
+            self._marker = marker
+            self._built_at = self._refreshed_at = now
+            self.built = True
+
+    def refresh(self, product_ids):
+        """Re-read the given products; ids that no longer exist are dropped."""
+        if not self.built or not product_ids:
+            return
+        rows = db.session.execute(self._select().where(Product.id.in_(product_ids))).all()
+        self._apply(product_ids, rows)
+
+    def refresh_changed(self):
+        """Apply every product changed since the last marker."""
+        statement = self._select()
+        if self._marker is not None:
+            statement = statement.where(Product.updated_at >= self._marker - MARKER_OVERLAP)
+        rows = db.session.execute(statement).all()
+        self._apply([row.id for row in rows], rows)
+        with self._lock:
+            self._marker = self._newest(rows, self._marker)
+            self._refreshed_at = time.monotonic()
+
+    def ensure_fresh(self, interval):
+        """Build on first use, rebuild after REBUILD_INTERVAL, else pick up changes every ``interval`` seconds."""
+        now = time.monotonic()
+        if self.built and now - self._built_at <= REBUILD_INTERVAL and now - self._refreshed_at <= interval:
+            return
+        # One request does the work; the others keep searching the current index if there is one
+        if not self._build_lock.acquire(blocking=not self.built):
+            return
+        try:
+            now = time.monotonic()
+            if not self.built or now - self._built_at > REBUILD_INTERVAL:
+                self.build()
+            elif now - self._refreshed_at > interval:
+                self.refresh_changed()
+        finally:
+            self._build_lock.release()
+
+    def _apply(self, product_ids, rows):
+        with self._lock:
+            for product_id in product_ids:
+                self._remove(product_id)
+            for row in rows:
+                for token in self._add(row):
+                    index = bisect.bisect_left(self._vocabulary, token)
+                    if index == len(self._vocabulary) or self._vocabulary[index] != token:
+                        self._vocabulary.insert(index, token)
+
+    def search(self, text, match_all=True, category_id=None, min_price=None, max_price=None):
+        """
+        Return ``[(product_id, score), ...]`` for ``text``, best match first.
+
+        With ``match_all`` every query term must match (AND), otherwise any
+        term may (OR). The last term also matches as a prefix. Scores are
+        BM25 over name and description tokens.
+        """
+        terms = tokenize(text)
+        if not terms:
+            return []
+
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not doc_count:
+                return []
+            average_length = self._total_length / doc_count
+
+            scores = None
+            for position, term in enumerate(terms):
+                if position == len(terms) - 1:
+                    expansions = self._expand_prefix(term)
+                else:
+                    expansions = [term] if term in self._postings else []
+
+                term_scores = {}
+                for token in expansions:
+                    postings = self._postings[token]
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for product_id, frequency in postings.items():
+                        norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[product_id] / average_length)
+                        weight = idf * frequency * (self.k1 + 1) / (frequency + norm)
+                        term_scores[product_id] = term_scores.get(product_id, 0.0) + weight
+
+                if scores is None:
+                    scores = term_scores
+                elif match_all:
+                    scores = {
+                        product_id: score + term_scores[product_id]
+                        for product_id, score in scores.items()
+                        if product_id in term_scores
+                    }
+                else:
+                    for product_id, score in term_scores.items():
+                        scores[product_id] = scores.get(product_id, 0.0) + score
+
+                if match_all and not scores:
+                    return []
+
+            results = []
+            for product_id, score in scores.items():
+                doc_category, price = self._doc_attrs[product_id]
+                if category_id and doc_category != category_id:
+                    continue
+                if min_price is not None and price < min_price:
+                    continue
+                if max_price is not None and price > max_price:
+                    continue
+                results.append((product_id, score))
+
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results
+
+    def _expand_prefix(self, prefix):
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\uffff", start)
+        return self._vocabulary[start:end]
+
+    def _add(self, row):
+        terms = Counter(tokenize(row.name or ""))
+        for token in terms:
+            terms[token] *= NAME_BOOST
+        terms.update(tokenize(row.description or ""))
+
+        new_tokens = []
+        for token, frequency in terms.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                new_tokens.append(token)
+            postings[row.id] = frequency
+
+        length = sum(terms.values())
+        self._doc_terms[row.id] = tuple(terms)
+        self._doc_lengths[row.id] = length
+        self._doc_attrs[row.id] = (row.category_id, row.price)
+        self._total_length += length
+        return new_tokens
+
+    def _remove(self, product_id):
+        terms = self._doc_terms.pop(product_id, None)
+        if terms is None:
+            return
+        for token in terms:
+            postings = self._postings[token]
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[token]
+                index = bisect.bisect_left(self._vocabulary, token)
+                if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                    del self._vocabulary[index]
+        self._total_length -= self._doc_lengths.pop(product_id)
+        del self._doc_attrs[product_id]
+
+
+search_index = ProductSearchIndex()
+
+
+def use_search_index(app):
+    """Return True when ``q`` searches should go through ``search_index``, bringing it up to date."""
+    if app.config.get("SEARCH_BACKEND") != "memory":
+        return False
+    search_index.ensure_fresh(app.config.get("SEARCH_INDEX_REFRESH", 5))
+    return True
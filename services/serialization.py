@@ -0,0 +1,29 @@
+def row_serializer(keys, converters=None):
+    """
+    Compile a function that turns ``select()`` rows into dicts.
+
+    ``keys`` name the leading columns of each row in order; any further
+    columns are ignored. ``converters`` maps a key to a function applied to
+    its value. The returned function takes an iterable of rows and returns a
+    list of dicts, working on the raw tuples without ORM instances.
+    """
+    keys = tuple(keys)
+    steps = tuple(
+        (position, converters[key]) for position, key in enumerate(keys)
+        if converters and key in converters
+    )
+
+    if not steps:
+        def serialize(rows):
+            return [dict(zip(keys, row)) for row in rows]
+        return serialize
+
+    def serialize(rows):
+        results = []
+        for row in rows:
+            values = list(row)
+            for position, convert in steps:
+                values[position] = convert(values[position])
+            results.append(dict(zip(keys, values)))
+        return results
+    return serialize
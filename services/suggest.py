@@ -0,0 +1,172 @@
+import bisect
+import heapq
+import threading
+import time
+
+from models import db
+from models.category import Category
+from models.product import Product
+from models.product_sales import ProductSales
+
+# Most suggestions a client may ask for per kind
+MAX_SUGGESTIONS = 20
+
+# Prefixes up to this length match large ranges, so their top lists are cached
+SHORT_PREFIX_LENGTH = 2
+
+# Rebuild from scratch this often so popularity follows new orders
+REBUILD_INTERVAL = 600
+
+_MAX_CHAR = "\uffff"
+
+
+def normalize(text):
+    """Lowercase and collapse whitespace so prefixes match case-insensitively."""
+    return " ".join((text or "").lower().split())
+
+
+class PrefixIndex:
+    """
+    Names kept in a sorted array for prefix lookups with bisect.
+
+    Each entry has a popularity score; ``top`` returns the highest scoring
+    names under a prefix. Short prefixes cover large slices of the array, so
+    their answers are cached until an entry under them changes.
+    """
+
+    def __init__(self, items=()):
+        self._entries = {}   # id -> (key, name, score)
+        self._keys = []      # sorted (key, id)
+        self._top_cache = {}
+        for item_id, name, score in items:
+            key = normalize(name)
+            self._entries[item_id] = (key, name, score)
+            self._keys.append((key, item_id))
+        self._keys.sort()
+
+    def upsert(self, item_id, name, score=None):
+        old = self._entries.get(item_id)
+        if score is None:
+            score = old[2] if old else 0
+        self.remove(item_id)
+        key = normalize(name)
+        self._entries[item_id] = (key, name, score)
+        bisect.insort(self._keys, (key, item_id))
+        self._invalidate(key)
+
+    def remove(self, item_id):
+        old = self._entries.pop(item_id, None)
+        if old is None:
+            return
+        index = bisect.bisect_left(self._keys, (old[0], item_id))
+        if index < len(self._keys) and self._keys[index] == (old[0], item_id):
+            del self._keys[index]
+        self._invalidate(old[0])
+
+    def top(self, prefix, limit):
+        """Return ``[(id, name), ...]`` for the ``limit`` most popular names starting with ``prefix``."""
+        prefix = normalize(prefix)
+        if len(prefix) <= SHORT_PREFIX_LENGTH:
+            ids = self._top_cache.get(prefix)
+            if ids is None:
+                ids = self._top_cache[prefix] = self._scan(prefix, MAX_SUGGESTIONS)
+            ids = ids[:limit]
+        else:
+            ids = self._scan(prefix, limit)
+        return [(item_id, self._entries[item_id][1]) for item_id in ids]
+
+    def _scan(self, prefix, limit):
+        start = bisect.bisect_left(self._keys, (prefix,))
+        end = bisect.bisect_left(self._keys, (prefix + _MAX_CHAR,), start)
+        return heapq.nsmallest(
+            limit,
+            (item_id for _, item_id in self._keys[start:end]),
+            key=lambda item_id: (-self._entries[item_id][2], self._entries[item_id][0], item_id),
+        )
+
+    def _invalidate(self, key):
+        for length in range(SHORT_PREFIX_LENGTH + 1):
+            self._top_cache.pop(key[:length], None)
+
+
+class SuggestIndex:
+    """Product and category name suggestions ranked by completed-order popularity."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._products = None
+        self._categories = None
+        self._built_at = 0.0
+
+    def suggest(self, prefix, limit=10):
+        """Return the top product and category names for ``prefix``."""
+        limit = max(1, min(limit, MAX_SUGGESTIONS))
+        self._ensure_fresh()
+        with self._lock:
+            products = self._products.top(prefix, limit)
+            categories = self._categories.top(prefix, limit)
+        return {
+            "products": [{"id": item_id, "name": name} for item_id, name in products],
+            "categories": [{"id": item_id, "name": name} for item_id, name in categories],
+        }
+
+    def _stale(self):
+        return self._products is None or time.monotonic() - self._built_at > REBUILD_INTERVAL
+
+    def _ensure_fresh(self):
+        if not self._stale():
+            return
+        # One request rebuilds; the others keep serving the old index if there is one
+        if self._build_lock.acquire(blocking=self._products is None):
+            try:
+                if self._stale():
+                    self.build()
+            finally:
+                self._build_lock.release()
+
+    def build(self):
+        """Reload every name and popularity score from the database."""
+        popularity = dict(
+            db.session.execute(db.select(ProductSales.product_id, ProductSales.order_count)).all()
+        )
+
+        category_popularity = {}
+        product_items = []
+        for product_id, name, category_id in db.session.execute(
+            db.select(Product.id, Product.name, Product.category_id)
+        ):
+            score = popularity.get(product_id, 0)
+            product_items.append((product_id, name, score))
+            category_popularity[category_id] = category_popularity.get(category_id, 0) + score
+
+        category_items = [
+            (category_id, name, category_popularity.get(category_id, 0))
+            for category_id, name in db.session.execute(db.select(Category.id, Category.name))
+        ]
+
+        products = PrefixIndex(product_items)
+        categories = PrefixIndex(category_items)
+        with self._lock:
+            self._products = products
+            self._categories = categories
+            self._built_at = time.monotonic()
+
+    def refresh_products(self, product_ids):
+        """Re-read the names of the given products, keeping their popularity."""
+        if self._products is None:
+            return
+        rows = dict(
+            db.session.execute(
+                db.select(Product.id, Product.name).where(Product.id.in_(product_ids))
+            ).all()
+        )
+        with self._lock:
+            for product_id in product_ids:
+                if product_id in rows:
+                    self._products.upsert(product_id, rows[product_id])
+                else:
+                    self._products.remove(product_id)
+
+
+suggest_index = SuggestIndex()
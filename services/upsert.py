@@ -0,0 +1,18 @@
+from models import db
+
+
+def upsert_insert(model):
+    """
+    Return an INSERT for ``model`` that supports ``on_conflict_do_update``.
+
+    Postgres and SQLite both implement ``INSERT ... ON CONFLICT``, but
+    SQLAlchemy exposes it through each dialect's own ``insert`` construct.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"ON CONFLICT upserts are not supported on {dialect}")
+    return insert(model)
@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+# app.py builds an app at import time, so it needs a database URL first
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """An app on a fresh SQLite file with every model table created."""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy import event
+
+from models import db
+from models.cart import Cart
+from models.cart_product import CartProduct
+from models.category import Category
+from models.product import Product
+from models.user import User
+
+
+def seed_cart(lines):
+    """A buyer whose cart holds ``lines`` products, two of each."""
+    db.session.add_all([
+        User(username="seller", email="seller@example.com", password_hash="x", role="seller"),
+        User(username="buyer", email="buyer@example.com", password_hash="x"),
+        Category(name="Books"),
+    ])
+    db.session.flush()
+    products = [
+        Product(name=f"Book {number}", description="A book", price=10.0 + number, stock=5,
+                seller_id=1, category_id=1)
+        for number in range(lines)
+    ]
+    cart = Cart(user_id=2)
+    db.session.add_all(products + [cart])
+    db.session.flush()
+    db.session.add_all(CartProduct(cart_id=cart.id, product_id=product.id, quantity=2) for product in products)
+    cart_id = cart.id
+    db.session.commit()
+    db.session.expunge_all()
+    return cart_id
+
+
+class StatementLog:
+    """Record every statement sent to the database while in use."""
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(db.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(db.engine, "before_cursor_execute", self._record)
+
+    def _record(self, connection, cursor, statement, *args):
+        self.statements.append(statement)
+
+
+def test_get_cart_is_one_query(client):
+    cart_id = seed_cart(40)
+
+    with StatementLog() as log:
+        response = client.get("/api/cart?email=buyer@example.com")
+
+    assert response.status_code == 200
+    assert len(log.statements) == 1, log.statements
+    items = response.get_json()
+    assert len(items) == 40
+    assert items[0] == {
+        "cart_id": cart_id,
+        "product_id": 1,
+        "quantity": 2,
+        "product_name": "Book 0",
+        "price": 10.0,
+        "image_url": None,
+        "stock": 5,
+    }
+
+
+def test_get_cart_unknown_email_and_no_cart(client):
+    seed_cart(0)
+    db.session.execute(db.delete(Cart))
+    db.session.commit()
+
+    assert client.get("/api/cart?email=nobody@example.com").status_code == 400
+    response = client.get("/api/cart?email=buyer@example.com")
+    assert response.status_code == 200
+    assert response.get_json() == []
+
+
+def test_add_and_checkout_use_the_same_cart(client):
+    seed_cart(0)
+    db.session.add(Cart(user_id=2))
+    db.session.commit()
+
+    db.session.add(Product(name="Lamp", description="A lamp", price=20.0, stock=3, seller_id=1, category_id=1))
+    db.session.commit()
+    added = client.post("/api/cart", json={"email": "buyer@example.com", "product_id": 1, "quantity": 2})
+    reduced = client.post("/api/cart", json={"email": "buyer@example.com", "product_id": 1, "quantity": -1})
+    assert added.get_json()["cart_id"] == reduced.get_json()["cart_id"] == 1
+
+    checkout = client.post("/api/cart/checkout", json={"email": "buyer@example.com"})
+    assert checkout.status_code == 200
+    assert checkout.get_json()["final_total"] == 20.0
+
+
+def test_each_checkout_runs_its_deferred_work(client):
+    from models.product_sales import ProductSales
+
+    seed_cart(0)
+    db.session.add(Product(name="Lamp", description="A lamp", price=100.0, stock=10, seller_id=1, category_id=1))
+    db.session.commit()
+
+    for checkout_number in (1, 2):
+        client.post("/api/cart", json={"email": "buyer@example.com", "product_id": 1, "quantity": 1}).close()
+        response = client.post("/api/cart/checkout", json={"email": "buyer@example.com"})
+        assert response.status_code == 200
+        # The WSGI server closes the response once it is sent; that runs the deferred tasks
+        response.close()
+
+        db.session.expire_all()
+        assert db.session.get(User, 2).credits == pytest.approx(1.0 * checkout_number)
+        sales = db.session.get(ProductSales, 1)
+        assert (sales.order_count, sales.units_sold) == (checkout_number, checkout_number)
@@ -0,0 +1,62 @@
+import importlib
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from models import db
+from models.cart import Cart
+from models.group_buy_participant import GroupBuyParticipant
+from models.order import Order
+from models.order_item import OrderItem
+from models.product import Product
+
+migration = importlib.import_module("migrations.versions.e91b5c3d7a48_index_hot_foreign_keys_and_filters")
+
+# (index the query should use, query)
+HOT_QUERIES = [
+    ("ix_cart_user_id", db.select(Cart).where(Cart.user_id == 1)),
+    (
+        "ix_order_user_id_created_at",
+        db.select(Order).where(Order.user_id == 1).order_by(Order.created_at.desc()),
+    ),
+    ("ix_order_item_order_id", db.select(OrderItem).where(OrderItem.order_id == 1)),
+    ("ix_order_item_product_id", db.select(OrderItem).where(OrderItem.product_id == 1)),
+    (
+        "ix_group_buy_participants_group_buy_id",
+        db.select(GroupBuyParticipant).where(GroupBuyParticipant.group_buy_id == 1),
+    ),
+    ("ix_order_status", db.select(Order).where(Order.status == 'completed')),
+    (
+        "ix_product_category_id_created_at_id",
+        db.select(Product)
+        .where(Product.category_id == 1)
+        .order_by(Product.created_at.desc(), Product.id.desc()),
+    ),
+    ("ix_product_seller_id", db.select(Product).where(Product.seller_id == 1)),
+]
+
+
+@pytest.fixture
+def migrated(app):
+    """Swap the model-created indexes for the ones the migration builds."""
+    with db.engine.begin() as connection:
+        for name, _, _ in migration.INDEXES:
+            connection.exec_driver_sql(f'DROP INDEX IF EXISTS "{name}"')
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+    return app
+
+
+@pytest.mark.parametrize("index, query", HOT_QUERIES, ids=[index for index, _ in HOT_QUERIES])
+def test_hot_query_uses_index(migrated, index, query):
+    assert index in {name for name, _, _ in migration.INDEXES}
+
+    sql = str(query.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    plan = [row[-1] for row in db.session.execute(db.text("EXPLAIN QUERY PLAN " + sql))]
+    table = query.get_final_froms()[0].name
+
+    assert any(f"USING INDEX {index}" in step for step in plan), plan
+    assert not any(step.startswith(f"SCAN {table}") for step in plan), plan
+    # Ordered queries must read the index in order rather than sort afterwards
+    assert not any("TEMP B-TREE" in step for step in plan), plan
@@ -0,0 +1,51 @@
+import importlib
+from datetime import datetime
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from models import db
+from models.category import Category
+from models.product import Product
+from models.user import User
+
+migration = importlib.import_module("migrations.versions.b47e2c9a1f35_require_created_at_on_paged_tables")
+
+
+def run(step):
+    with db.engine.begin() as connection:
+        with Operations.context(MigrationContext.configure(connection)):
+            step()
+
+
+def test_undated_products_are_backfilled_and_paged(client):
+    run(migration.downgrade)
+    db.session.add_all([
+        User(username="seller", email="seller@example.com", password_hash="x", role="seller"),
+        Category(name="Books"),
+    ])
+    db.session.flush()
+    db.session.add_all([
+        Product(name="New", description="a", price=1.0, seller_id=1, category_id=1, created_at=datetime(2026, 1, 1)),
+        Product(name="Edited", description="a", price=1.0, seller_id=1, category_id=1,
+                updated_at=datetime(2025, 1, 1)),
+        Product(name="Undated", description="a", price=1.0, seller_id=1, category_id=1),
+    ])
+    db.session.commit()
+    # Raw SQL, so updated_at's onupdate does not overwrite what is being set up
+    db.session.execute(db.text("UPDATE product SET created_at = NULL WHERE name != 'New'"))
+    db.session.execute(db.text("UPDATE product SET updated_at = NULL WHERE name = 'Undated'"))
+    db.session.commit()
+
+    run(migration.upgrade)
+
+    names, cursor = [], None
+    while True:
+        response = client.get("/api/products", query_string={"limit": 1, "cursor": cursor})
+        assert response.status_code == 200
+        page = response.get_json()
+        names += [product["name"] for product in page["products"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert names == ["New", "Edited", "Undated"]
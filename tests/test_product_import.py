@@ -0,0 +1,76 @@
+import pytest
+
+from models import db
+from models.category import Category
+from models.product import Product
+from models.user import User
+import services.product_import as product_import
+
+HEADER = "name,description,price,stock,seller_id,category_id\n"
+
+
+@pytest.fixture
+def catalog(app):
+    db.session.add_all([
+        User(username="seller", email="seller@example.com", password_hash="x", role="seller"),
+        Category(name="Books"),
+    ])
+    db.session.commit()
+
+
+def product_names():
+    return db.session.execute(db.select(Product.name).order_by(Product.id)).scalars().all()
+
+
+def post_csv(client, body):
+    return client.post("/api/products/import", data=body.encode(), content_type="text/csv")
+
+
+def test_malformed_csv_rows_are_reported(client, catalog):
+    body = HEADER + "One,a,1.0,1,1,1\nT\x00wo,a,1.0,1,1,1\nThree,a,1.0,1,1,1\nFour,\"a\"b,1.0,1,1,1\n"
+
+    response = post_csv(client, body)
+
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report["inserted"] == 2
+    assert [error["row"] for error in report["errors"]] == [2, 4]
+    assert report["errors"][1]["error"].startswith("Malformed CSV")
+    assert product_names() == ["One", "Three"]
+
+
+@pytest.mark.parametrize("column", ["stock", "seller_id", "category_id"])
+def test_integer_beyond_column_range_is_reported(client, catalog, column):
+    row = {"name": "Big", "description": "a", "price": "1.0", "stock": "1", "seller_id": "1", "category_id": "1"}
+    row[column] = str(2 ** 63)
+    body = HEADER + "Small,a,1.0,1,1,1\n" + ",".join(row.values()) + "\n"
+
+    response = post_csv(client, body)
+
+    assert response.status_code == 200
+    assert response.get_json()["errors"] == [
+        {"row": 2, "error": f"{column} must be at most {product_import.MAX_INTEGER}"}
+    ]
+    assert product_names() == ["Small"]
+
+
+def test_failed_chunk_is_reported_and_earlier_chunks_kept(client, catalog, monkeypatch):
+    validate_record = product_import.validate_record
+
+    def break_third_row(record, default_seller_id):
+        values = validate_record(record, default_seller_id)
+        if values["name"] == "Three":
+            values["name"] = None  # violates NOT NULL on insert
+        return values
+
+    monkeypatch.setattr(product_import, "IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(product_import, "validate_record", break_third_row)
+    body = HEADER + "".join(f"{name},a,1.0,1,1,1\n" for name in ("One", "Two", "Three", "Four", "Five"))
+
+    response = post_csv(client, body)
+
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report["inserted"] == 3
+    assert [error["row"] for error in report["errors"]] == [3, 4]
+    assert product_names() == ["One", "Two", "Five"]
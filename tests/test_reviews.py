@@ -0,0 +1,42 @@
+import pytest
+
+from models import db
+from models.category import Category
+from models.product import Product
+from models.review import Review
+from models.user import User
+
+
+@pytest.fixture
+def product(app):
+    db.session.add_all([
+        User(username="seller", email="seller@example.com", password_hash="x", role="seller"),
+        User(username="buyer", email="buyer@example.com", password_hash="x"),
+        Category(name="Books"),
+    ])
+    db.session.flush()
+    db.session.add(Product(name="Book", description="A book", price=10.0, stock=5, seller_id=1, category_id=1))
+    db.session.commit()
+    return 1
+
+
+@pytest.mark.parametrize("rating", [1.0, 4.5, "3", True, None, 0, 6])
+def test_invalid_rating_is_rejected(client, product, rating):
+    response = client.post(f"/api/products/{product}/reviews", json={"email": "buyer@example.com", "rating": rating})
+
+    assert response.status_code == 400
+    assert db.session.execute(db.select(db.func.count()).select_from(Review)).scalar() == 0
+    assert db.session.execute(db.select(Product.rating_count, Product.rating_sum)).one() == (0, 0)
+
+
+def test_review_updates_aggregates(client, product):
+    for rating in (5, 4, 4):
+        response = client.post(
+            f"/api/products/{product}/reviews", json={"email": "buyer@example.com", "rating": rating}
+        )
+        assert response.status_code == 201
+
+    detail = client.get(f"/api/home/product/{product}").get_json()
+    assert detail["review_count"] == 3
+    assert detail["average_rating"] == pytest.approx(13 / 3)
+    assert detail["rating_histogram"] == {"1": 0, "2": 0, "3": 0, "4": 2, "5": 1}